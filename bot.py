@@ -20,13 +20,23 @@ import os
 import sys
 import time
 import math
+import json
+import itertools
 import requests
 import threading
 import logging
-from logging.handlers import RotatingFileHandler
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
+import copy
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
 import traceback
+import socket
+import hmac
+import hashlib
+import base64
 
 try:
     import ccxt
@@ -34,6 +44,18 @@ except Exception:
     print("ccxt required. pip install ccxt")
     raise
 
+try:
+    import websocket  # websocket-client; optional, REST polling is used without it
+except Exception:
+    websocket = None
+
+try:
+    import orjson  # optional, several times faster than stdlib json on the ~100KB book payloads
+    _json_loads = orjson.loads
+except Exception:
+    orjson = None
+    _json_loads = json.loads
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -53,9 +75,20 @@ MARGIN_BUFFER = float(os.getenv('MARGIN_BUFFER', "1.02"))  # used to estimate re
 
 WATCHER_POLL_INTERVAL = float(os.getenv('WATCHER_POLL_INTERVAL', "0.5"))
 WATCHER_DETECT_CONFIRM = int(os.getenv('WATCHER_DETECT_CONFIRM', "2"))
+WATCHER_VERBOSE = os.getenv('WATCHER_VERBOSE', "0") == "1"  # per-poll watcher state lines (DEBUG, log file)
+WATCHER_RECONCILE_S = float(os.getenv('WATCHER_RECONCILE_S', "30"))  # REST cross-check while position streams are live
 
 MAX_NOTIONAL_MISMATCH_PCT = float(os.getenv('MAX_NOTIONAL_MISMATCH_PCT', "0.5"))
 REBALANCE_MIN_DOLLARS = float(os.getenv('REBALANCE_MIN_DOLLARS', "0.5"))
+# largest leg mismatch (%) kept when the rebalance diff is under the venue's minimum order; above it both legs close
+MAX_UNSENDABLE_MISMATCH_PCT = float(os.getenv('MAX_UNSENDABLE_MISMATCH_PCT', "2.0"))
+
+WS_ENABLED = os.getenv('WS_ENABLED', "1") == "1" and websocket is not None
+WS_STALE_MS = float(os.getenv('WS_STALE_MS', "500"))  # pushed quotes older than this fall back to REST
+CONN_KEEPALIVE_S = float(os.getenv('CONN_KEEPALIVE_S', "20"))  # idle REST connections are refreshed this often (0 = off)
+# optional CPU pinning, e.g. "3" or "2,3" (cores isolated with isolcpus=); empty leaves scheduling alone
+CPU_AFFINITY = os.getenv('CPU_AFFINITY', '').strip()
+PRICE_TIMEOUT = (1.0, 2.0)  # (connect, read) seconds for exit-monitor REST price fallbacks
 
 SCAN_THRESHOLD = 0.25
 ALERT_THRESHOLD = 5.0
@@ -65,18 +98,31 @@ MAX_WORKERS = 12
 
 MONITOR_DURATION = 60
 MONITOR_POLL = 2
+# floor between monitoring rounds when rounds are woken by pushed quotes (MONITOR_POLL stays the ceiling)
+SCANNER_MIN_ROUND_S = float(os.getenv('SCANNER_MIN_ROUND_S', '0.25'))
+# how long the trigger spread must hold (monotonic clock, from the first qualifying round) before entry
+ENTRY_CONFIRM_MS = int(os.getenv('ENTRY_CONFIRM_MS', '500'))
 CONFIRM_RETRY_DELAY = 0.5
+EXIT_FLAT_SPREAD = 0.02  # |exit spread| (%) below which the legs count as converged and the trade exits
+EXIT_CONFIRMS = 3        # consecutive exit-condition passes required before closing
+# ...and how long (monotonic clock, from the first passing round) the exit condition must hold: passes
+# follow pushed ticks, so the pass count alone could complete within milliseconds on a busy book
+EXIT_CONFIRM_MS = int(os.getenv('EXIT_CONFIRM_MS', '200'))
 CONFIRM_RETRIES = 2
+CLOSE_REST_CHECK_S = 2.0  # while unwinding, REST re-checks positions at least this often even if the stream says open
 
 BINANCE_INFO_URL = "https://fapi.binance.com/fapi/v1/exchangeInfo"
 BINANCE_BOOK_URL = "https://fapi.binance.com/fapi/v1/ticker/bookTicker"
 BINANCE_TICKER_URL = "https://fapi.binance.com/fapi/v1/ticker/bookTicker?symbol={symbol}"
 KUCOIN_ACTIVE_URL = "https://api-futures.kucoin.com/api/v1/contracts/active"
 KUCOIN_TICKER_URL = "https://api-futures.kucoin.com/api/v1/ticker?symbol={symbol}"
+BINANCE_WS_URL = "wss://fstream.binance.com/ws"
+KUCOIN_BULLET_URL = "https://api-futures.kucoin.com/api/v1/bullet-public"
 
 print(f"\n{'='*72}")
 print(f"INTEGRATED SCANNER+TRADER | NOTIONAL ${NOTIONAL} @ {LEVERAGE}x | ENTRY >= {ENTRY_SPREAD}% | PROFIT TARGET {PROFIT_TARGET}%")
-print(f"NOTIONAL mismatch tolerance: {MAX_NOTIONAL_MISMATCH_PCT}% | REBALANCE_MIN_DOLLARS: ${REBALANCE_MIN_DOLLARS}")
+print(f"NOTIONAL mismatch tolerance: {MAX_NOTIONAL_MISMATCH_PCT}% | REBALANCE_MIN_DOLLARS: ${REBALANCE_MIN_DOLLARS} | unsendable residual cap: {MAX_UNSENDABLE_MISMATCH_PCT}%")
+print(f"WebSocket quotes: {'ON' if WS_ENABLED else 'OFF (REST polling)'} | stale after {WS_STALE_MS:.0f}ms")
 print(f"{'='*72}\n")
 
 # -------------------- Logging setup --------------------
@@ -87,72 +133,299 @@ ch = logging.StreamHandler()
 ch.setLevel(logging.INFO)
 ch_formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s", "%Y-%m-%d %H:%M:%S")
 ch.setFormatter(ch_formatter)
-logger.addHandler(ch)
 
 fh = RotatingFileHandler("integrated_arb.log", maxBytes=10_000_000, backupCount=5)
 fh.setLevel(logging.DEBUG)
 fh_formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
 fh.setFormatter(fh_formatter)
-logger.addHandler(fh)
+
+# Trading threads only enqueue records; formatting and the console/file writes happen on the
+# listener's background thread. The stock QueueHandler.prepare() formats the message on the caller,
+# so prepare() is overridden to defer it wherever that is safe.
+_SCALAR_LOG_ARGS = (str, int, float, bool, type(None))
+_exc_formatter = logging.Formatter()
+
+class _DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        """
+        Enqueue a copy of the record with its %-args still unformatted when they are all immutable scalars.
+        Anything else (containers, objects) could change before the listener runs, so those records and
+        tracebacks are rendered here, as the stock handler would.
+        """
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(type(a) in _SCALAR_LOG_ARGS for a in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+_log_queue = queue.SimpleQueue()
+logger.addHandler(_DeferredQueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, ch, fh, respect_handler_level=True)
+_log_listener.start()
+
+# Per-poll liquidation watcher state goes to the log file at DEBUG, and only when WATCHER_VERBOSE=1;
+# otherwise the level check rejects the call before any of its floats are formatted.
+watcher_logger = logging.getLogger("integrated_arb.watcher")
+watcher_logger.setLevel(logging.DEBUG if WATCHER_VERBOSE else logging.INFO)
+
+# Console output gets the same treatment: console_print() renders the line on the caller's thread and
+# enqueues it; one daemon thread owns stdout, so a stalled terminal/pipe never blocks an order or close
+# path. A full queue drops (and counts) lines instead of blocking the caller.
+_console_queue = queue.Queue(maxsize=10_000)
+_console_dropped = 0
+_console_drop_lock = threading.Lock()
+
+def _console_writer():
+    global _console_dropped
+    out = sys.stdout
+    while True:
+        line = _console_queue.get()
+        if line is None:
+            out.flush()
+            return
+        out.write(line)
+        if _console_dropped:
+            with _console_drop_lock:
+                n, _console_dropped = _console_dropped, 0
+            out.write(f"[console] {n} line(s) dropped while the writer was behind\n")
+        if _console_queue.empty():
+            out.flush()
+
+def console_print(*args, sep=' ', end='\n'):
+    global _console_dropped
+    try:
+        _console_queue.put_nowait(sep.join(map(str, args)) + end)
+    except queue.Full:
+        with _console_drop_lock:
+            _console_dropped += 1
+
+_console_thread = threading.Thread(target=_console_writer, name='console', daemon=True)
+_console_thread.start()
+
+def stop_console_writer():
+    # drain whatever is queued, then let the writer exit
+    _console_queue.put(None)
+    _console_thread.join(timeout=5)
 
 def timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+# (epoch second, "HH:MM:SS") for the current second; rebuilt only when the second rolls over.
+_hms_cache = (None, "")
+
+def now_hms_ms():
+    """Local HH:MM:SS.mmm without building a datetime or running strftime on every log line."""
+    global _hms_cache
+    t = time.time()
+    sec = int(t)
+    cached_sec, hms = _hms_cache
+    if sec != cached_sec:
+        lt = time.localtime(sec)
+        hms = f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}"
+        _hms_cache = (sec, hms)
+    return f"{hms}.{int((t - sec) * 1000):03d}"
+
+def dt_hms_ms(dt):
+    # HH:MM:SS.mmm of an existing datetime (trigger times) from its integer fields, no strftime
+    return f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.{dt.microsecond // 1000:03d}"
+
 # ======================= Exchanges (ccxt) =======================
+# One keep-alive session for every HTTP call the bot makes (both ccxt clients included), so bursts
+# reuse pooled TCP+TLS connections instead of each client/helper opening its own.
+class _KeepAliveAdapter(HTTPAdapter):
+    # urllib3 already sets TCP_NODELAY; SO_KEEPALIVE additionally lets the kernel keep idle pooled
+    # sockets alive between the bot's rare bursts of orders
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(*args, **kwargs)
+
+http_session = requests.Session()
+http_session.mount('https://', _KeepAliveAdapter(pool_connections=16, pool_maxsize=max(32, MAX_WORKERS), max_retries=0))
+
 binance = ccxt.binance({
     'apiKey': os.getenv('BINANCE_API_KEY'),
     'secret': os.getenv('BINANCE_API_SECRET'),
     'options': {'defaultType':'future'},
-    'enableRateLimit': True
+    'enableRateLimit': True,
+    'session': http_session
 })
 kucoin = ccxt.kucoinfutures({
     'apiKey': os.getenv('KUCOIN_API_KEY'),
     'secret': os.getenv('KUCOIN_API_SECRET'),
     'password': os.getenv('KUCOIN_API_PASSPHRASE'),
-    'enableRateLimit': True
+    'enableRateLimit': True,
+    'session': http_session
 })
 
+def _serialize_throttle(exchange):
+    # Sync ccxt's rate limiter reads/writes lastRestRequestTimestamp without a lock, and this bot
+    # shares each client across the scanner, exit monitor, watchers and order pool. Doing the
+    # wait and the timestamp update under one per-client lock keeps the spacing correct when two
+    # threads hit the same venue at once (different venues never contend).
+    lock = threading.Lock()
+    throttle = exchange.throttle
+
+    def locked_throttle(cost=None):
+        with lock:
+            throttle(cost)
+            exchange.lastRestRequestTimestamp = exchange.milliseconds()
+
+    exchange.throttle = locked_throttle
+
+_serialize_throttle(binance)
+_serialize_throttle(kucoin)
+
+def _cache_hmac_keys(exchange):
+    # ccxt builds a fresh hmac.new(secret, ...) (key schedule included) for every signed request;
+    # keying once per (secret, digestmod) and copying the primed object skips that per order leg
+    bases = {}
+
+    def cached_hmac(request, secret, algorithm=hashlib.sha256, digest='hex'):
+        base = bases.get((secret, algorithm))
+        if base is None:
+            base = bases[(secret, algorithm)] = hmac.new(secret, b'', algorithm)
+        h = base.copy()
+        h.update(request)
+        if digest == 'hex':
+            return h.hexdigest()
+        if digest == 'base64':
+            return base64.standard_b64encode(h.digest()).decode()
+        return h.digest()
+
+    exchange.hmac = cached_hmac
+
+_cache_hmac_keys(binance)
+_cache_hmac_keys(kucoin)
+
 def fix_time_offset():
     try:
-        server = requests.get("https://fapi.binance.com/fapi/v1/time", timeout=5).json().get('serverTime')
+        server = _json_loads(http_session.get("https://fapi.binance.com/fapi/v1/time", timeout=5).content).get('serverTime')
         if server: binance.options['timeDifference'] = int(time.time()*1000) - int(server)
     except Exception:
         pass
     try:
-        server = requests.get("https://api-futures.kucoin.com/api/v1/timestamp", timeout=5).json().get('data')
+        server = _json_loads(http_session.get("https://api-futures.kucoin.com/api/v1/timestamp", timeout=5).content).get('data')
         if server: kucoin.options['timeDifference'] = int(time.time()*1000) - int(server)
     except Exception:
         pass
 
 fix_time_offset()
 
-def ensure_markets_loaded():
-    for ex in [binance, kucoin]:
+# Warm the ccxt sessions with one cheap public call per exchange (in parallel) so the first
+# real order reuses a live TCP+TLS connection instead of paying the handshake on the trade path.
+def _ping_exchange(ex):
+    try:
+        ex.fetch_time()
+    except Exception:
+        pass
+
+def warm_exchange_connections():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(_ping_exchange, (binance, kucoin)))
+
+warm_exchange_connections()
+
+def _keep_connections_warm():
+    # venues drop idle HTTP keep-alive connections; a cheap call every CONN_KEEPALIVE_S keeps the
+    # first order after a quiet spell off the TCP+TLS handshake. This is a background thread, so the
+    # two pings just run one after the other here (no per-ping pool/threads).
+    # The entry/close check is best effort only: it is not taken under the scanner's lock, so an entry
+    # can still start while a ping is in flight and wait behind it (one public call) in the throttle.
+    while True:
+        time.sleep(CONN_KEEPALIVE_S)
+        for ex in (binance, kucoin):
+            if entry_in_progress.is_set() or closing_in_progress:
+                break
+            _ping_exchange(ex)
+
+def _load_markets(ex):
+    try:
+        ex.load_markets(reload=False)
+    except Exception:
         try:
-            ex.load_markets(reload=False)
+            ex.load_markets(reload=True)
         except Exception:
-            try:
-                ex.load_markets(reload=True)
-            except Exception:
-                pass
+            pass
+
+def ensure_markets_loaded():
+    # loaded at startup; hot paths must not pay ccxt's load_markets bookkeeping per lookup
+    pending = [ex for ex in (binance, kucoin) if not ex.markets]
+    if len(pending) == 2:
+        # cold start: the two market downloads are independent, so overlap them
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(_load_markets, pending))
+    else:
+        for ex in pending:
+            _load_markets(ex)
+
+def _market_by_id(exchange, market_id):
+    # The bot addresses Binance by raw id ("BTCUSDT"); ccxt keys exchange.markets by unified symbol and
+    # lists every market sharing an id (spot + USDT perpetual) in markets_by_id, so pick the perpetual.
+    found = (getattr(exchange, 'markets_by_id', None) or {}).get(market_id)
+    if isinstance(found, dict):
+        return found
+    if not found:
+        return None
+    for m in found:
+        if m.get('swap') and m.get('linear'):
+            return m
+    for m in found:
+        if m.get('contract'):
+            return m
+    return found[0]
+
+# (exchange.id, symbol or raw id) -> resolved ccxt market; market definitions are static for the session
+_MARKETS = {}
 
 def get_market(exchange, symbol):
+    m = _MARKETS.get((exchange.id, symbol))
+    if m is not None:
+        return m
     ensure_markets_loaded()
-    m = exchange.markets.get(symbol)
+    m = exchange.markets.get(symbol) or _market_by_id(exchange, symbol)
     if not m:
         try:
             exchange.load_markets(reload=True)
         except Exception:
             pass
-        m = exchange.markets.get(symbol)
+        m = exchange.markets.get(symbol) or _market_by_id(exchange, symbol)
+    if m:
+        _MARKETS[(exchange.id, symbol)] = m
     return m
 
+# KuCoin raw contract id -> ccxt unified symbol, resolved once per id for the session
+KUCOIN_TRADE_SYMBOLS = {}
+
 def resolve_kucoin_trade_symbol(exchange, raw_id):
-    try:
-        exchange.load_markets(reload=True)
-    except Exception:
-        pass
+    cached = KUCOIN_TRADE_SYMBOLS.get(raw_id)
+    if cached:
+        return cached
+    sym = _resolve_kucoin_trade_symbol(exchange, raw_id)
+    if sym:
+        KUCOIN_TRADE_SYMBOLS[raw_id] = sym
+    return sym
+
+def _resolve_kucoin_trade_symbol(exchange, raw_id):
+    # the startup markets answer nearly every id; reload only for a contract listed after startup
+    ensure_markets_loaded()
+    sym = _match_kucoin_trade_symbol(exchange, raw_id)
+    if sym is None:
+        try:
+            exchange.load_markets(reload=True)
+        except Exception:
+            pass
+        sym = _match_kucoin_trade_symbol(exchange, raw_id)
+    return sym
+
+def _match_kucoin_trade_symbol(exchange, raw_id):
     raw_id = (raw_id or "").upper()
+    m = _market_by_id(exchange, raw_id)
+    if m:
+        return m.get('symbol')
     for sym, m in (exchange.markets or {}).items():
         if (m.get('id') or "").upper() == raw_id:
             return sym
@@ -161,18 +434,23 @@ def resolve_kucoin_trade_symbol(exchange, raw_id):
             return sym
     return None
 
-def set_leverage_and_margin_for_symbol(bin_sym, kc_ccxt_sym):
+def _set_binance_leverage(bin_sym):
     try:
         binance.set_leverage(LEVERAGE, bin_sym)
-        print(f"Binance leverage set to {LEVERAGE}x for {bin_sym}")
+        console_print(f"Binance leverage set to {LEVERAGE}x for {bin_sym}")
     except Exception as e:
-        print(f"Binance leverage error for {bin_sym}: {e}")
+        console_print(f"Binance leverage error for {bin_sym}: {e}")
+
+def set_leverage_and_margin_for_symbol(bin_sym, kc_ccxt_sym):
+    # runs between entry confirmation and the orders: the two venues' calls go out together
+    f_bin = _order_pool.submit(_set_binance_leverage, bin_sym)
     if kc_ccxt_sym:
         try:
             kucoin.set_leverage(LEVERAGE, kc_ccxt_sym, {'marginMode':'cross'})
-            print(f"KuCoin leverage set to {LEVERAGE}x CROSS for {kc_ccxt_sym}")
+            console_print(f"KuCoin leverage set to {LEVERAGE}x CROSS for {kc_ccxt_sym}")
         except Exception as e:
-            print(f"KuCoin leverage error for {kc_ccxt_sym}: {e}")
+            console_print(f"KuCoin leverage error for {kc_ccxt_sym}: {e}")
+    wait([f_bin])
 
 ensure_markets_loaded()
 
@@ -183,7 +461,16 @@ entry_spreads = {}
 entry_prices = {}
 entry_actual = {}
 entry_confirm_count = {}
+# sym -> monotonic_ns of the round that took entry_confirm_count from 0 to 1 (start of the hold window)
+entry_first_seen_ns = {}
 exit_confirm_count = {}
+# sym -> monotonic_ns of the pass that took exit_confirm_count from 0 to 1 (start of the exit hold window)
+exit_first_seen_ns = {}
+# sym -> (case, case_a, entry_bin_px, entry_kc_px, entry_basis_spread, exit_scale); written together with
+# positions[sym] on acceptance so the exit monitor reads one entry per tick instead of four scattered
+# dicts. exit_scale = 100 / long-leg entry price, so the per-tick exit spread is a multiply; case_a is
+# the case as a bool so the per-tick branch is a truth test rather than a string compare.
+entry_params = {}
 
 KUCOIN_RAW_MAP = {}
 KUCOIN_CCXT_MAP = {}
@@ -200,54 +487,111 @@ entry_in_progress = threading.Event()  # when set, no other entry is started
 current_entry_symbol = None
 
 # -------------------- Helper functions (unchanged trading logic) --------------------
+# 10**p for the amount precisions ccxt reports (0..18 decimals), so sizing does not run int.__pow__ per call
+_POW10 = tuple(10**i for i in range(19))
+
 def round_down(value, precision):
     if precision is None: return float(value)
-    factor = 10**precision
+    factor = _POW10[precision]
     return math.floor(value*factor)/factor
 
-def compute_amount_for_notional(exchange, symbol, desired_usdt, price):
+# Static per-market sizing metadata keyed by (exchange.id, symbol): (amount_precision, contract_size).
+# Resolved once from the ccxt market and reused by sizing, notional matching and close paths.
+MARKET_META = {}
+
+def get_market_meta(exchange, symbol):
+    meta = MARKET_META.get((exchange.id, symbol))
+    if meta is not None:
+        return meta
     market = get_market(exchange, symbol)
     amount_precision = None
     contract_size = 1.0
     if market:
         prec = market.get('precision')
         if isinstance(prec, dict): amount_precision = prec.get('amount')
+        if amount_precision is not None and getattr(exchange, 'precisionMode', None) == ccxt.TICK_SIZE:
+            # tick-size markets report a step (0.001, 1, ...); round_down and sizing work in decimals
+            step = float(amount_precision)
+            amount_precision = max(0, int(round(-math.log10(step)))) if step > 0 else None
+        elif amount_precision is not None:
+            amount_precision = int(amount_precision)
         contract_size = float(market.get('contractSize') or market.get('info', {}).get('contractSize') or 1.0)
-    if price <= 0: return 0.0, 0.0, contract_size, amount_precision
-    if exchange.id == 'binance':
-        base = desired_usdt / price
-        amt = round_down(base, amount_precision)
-        implied = amt * contract_size * price
-        return float(amt), float(implied), contract_size, amount_precision
+        MARKET_META[(exchange.id, symbol)] = (amount_precision, contract_size)
+    return amount_precision, contract_size
+
+# (exchange.id, symbol) -> (min order cost in USDT, min order amount in base units), from market limits
+MIN_ORDER = {}
+
+def min_order_cost(exchange, symbol, price):
+    """Smallest USDT notional the venue accepts for symbol at price (0.0 when unknown)."""
+    lim = MIN_ORDER.get((exchange.id, symbol))
+    if lim is None:
+        market = get_market(exchange, symbol)
+        if not market:
+            return 0.0
+        limits = market.get('limits') or {}
+        cost_min = float((limits.get('cost') or {}).get('min') or 0.0)
+        amount_min = float((limits.get('amount') or {}).get('min') or 0.0)
+        if exchange.id != 'binance':
+            # KuCoin amounts are contracts
+            amount_min *= get_market_meta(exchange, symbol)[1]
+        lim = MIN_ORDER[(exchange.id, symbol)] = (cost_min, amount_min)
+    return max(lim[0], lim[1] * price)
+
+# Specialized sizing functions keyed by (exchange.id, symbol). Market metadata is static for the
+# session, so precision/contract size are resolved once and baked into a closure; the order path
+# then does a single dict hit and a handful of float ops instead of re-drilling the market dict.
+_AMT = {}
+
+def _specialize_amount_fn(exchange, symbol):
+    amount_precision, contract_size = get_market_meta(exchange, symbol)
+    # Binance sizes in base units; KuCoin sizes in contracts of contract_size base units.
+    divisor = 1.0 if exchange.id == 'binance' or not contract_size else contract_size
+    if amount_precision is None:
+        def amt_fn(price, notional):
+            amt = float(notional / price / divisor)
+            return amt, amt * contract_size * price
     else:
-        base = desired_usdt / price
-        contracts = base / contract_size if contract_size else base
-        contracts = round_down(contracts, amount_precision)
-        implied = contracts * contract_size * price
-        return float(contracts), float(implied), contract_size, amount_precision
+        factor = _POW10[amount_precision]
+        floor = math.floor
+        def amt_fn(price, notional):
+            amt = floor(notional / price / divisor * factor) / factor
+            return amt, amt * contract_size * price
+    spec = (amt_fn, contract_size, amount_precision)
+    if (exchange.id, symbol) in MARKET_META:
+        _AMT[(exchange.id, symbol)] = spec
+    return spec
+
+def compute_amount_for_notional(exchange, symbol, desired_usdt, price):
+    spec = _AMT.get((exchange.id, symbol)) or _specialize_amount_fn(exchange, symbol)
+    amt_fn, contract_size, amount_precision = spec
+    if price <= 0: return 0.0, 0.0, contract_size, amount_precision
+    amt, implied = amt_fn(price, desired_usdt)
+    return float(amt), float(implied), contract_size, amount_precision
+
+def _signed_qty(v):
+    # float() handles the well-formed payloads; the thousands-separator retry only runs on strings that need it
+    if v is None or v == '':
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        if isinstance(v, str) and ',' in v:
+            try:
+                return float(v.replace(',', ''))
+            except ValueError:
+                pass
+    return None
 
 def _get_signed_from_binance_pos(pos):
     info = pos.get('info') or {}
-    for fld in ('positionAmt',):
-        v = pos.get(fld)
-        if v not in (None, ''):
-            try:
-                return float(v)
-            except Exception:
-                try:
-                    return float(str(v).replace(',', ''))
-                except Exception:
-                    pass
+    q = _signed_qty(pos.get('positionAmt'))
+    if q is not None:
+        return q
     for fld in ('positionAmt', 'position_amount', 'amount'):
-        v = info.get(fld)
-        if v not in (None, ''):
-            try:
-                return float(v)
-            except Exception:
-                try:
-                    return float(str(v).replace(',', ''))
-                except Exception:
-                    pass
+        q = _signed_qty(info.get(fld))
+        if q is not None:
+            return q
     magnitude = 0.0
     for k in ('contracts', 'amount', 'size'):
         v = pos.get(k) or info.get(k)
@@ -270,16 +614,9 @@ def _get_signed_from_binance_pos(pos):
 
 def _get_signed_from_kucoin_pos(pos):
     info = pos.get('info') or {}
-    for fld in ('currentQty',):
-        v = info.get(fld)
-        if v not in (None, ''):
-            try:
-                return float(v)
-            except Exception:
-                try:
-                    return float(str(v).replace(',', ''))
-                except Exception:
-                    pass
+    q = _signed_qty(info.get('currentQty'))
+    if q is not None:
+        return q
     magnitude = 0.0
     for k in ('contracts', 'size', 'positionAmt', 'amount'):
         v = pos.get(k) or info.get(k)
@@ -323,62 +660,73 @@ def _get_signed_position_amount(pos):
 
 def get_total_futures_balance():
     try:
+        # the two venues are independent: KuCoin's round trip runs on the order pool under Binance's
+        f_kc = _order_pool.submit(kucoin.fetch_balance)
         bal_bin = binance.fetch_balance(params={'type':'future'})
         bin_usdt = float(bal_bin.get('USDT', {}).get('total', 0.0))
-        bal_kc = kucoin.fetch_balance()
+        bal_kc = f_kc.result()
         kc_usdt = float(bal_kc.get('USDT', {}).get('total', 0.0))
         total_balance = bin_usdt + kc_usdt
         return total_balance, bin_usdt, kc_usdt
     except Exception as e:
-        print(f"Error fetching balances: {e}")
+        console_print(f"Error fetching balances: {e}")
         return 0.0, 0.0, 0.0
 
-def has_open_positions():
-    try:
-        for sym in list(TRADED_BINANCE_SYMBOLS):
-            pos = None
+def _binance_legs_open():
+    for sym in list(TRADED_BINANCE_SYMBOLS):
+        pos = None
+        try:
+            pos = binance.fetch_positions([sym])
+        except Exception:
             try:
-                pos = binance.fetch_positions([sym])
+                pos = binance.fetch_positions()
             except Exception:
-                try:
-                    pos = binance.fetch_positions()
-                except Exception:
-                    pos = None
-            if pos:
-                p = pos[0]
-                raw = p.get('positionAmt') or p.get('contracts') or 0
-                try:
-                    if abs(float(raw or 0)) > 0:
-                        return True
-                except Exception:
-                    pass
-        for bin_sym, kc_ccxt_sym in KUCOIN_CCXT_MAP.items():
-            if not kc_ccxt_sym:
-                continue
-            pos = None
+                pos = None
+        if pos:
+            p = pos[0]
+            raw = p.get('positionAmt') or p.get('contracts') or 0
             try:
-                pos = kucoin.fetch_positions([kc_ccxt_sym])
+                if abs(float(raw or 0)) > 0:
+                    return True
             except Exception:
-                try:
-                    allp = kucoin.fetch_positions()
-                    for p in allp:
-                        if p.get('symbol') == kc_ccxt_sym:
-                            pos = [p]
-                            break
-                except Exception:
-                    pos = None
-            if pos:
-                raw = None
-                try:
-                    raw = pos[0].get('contracts') or pos[0].get('positionAmt') or pos[0].get('info', {}).get('currentQty') or 0
-                except Exception:
-                    raw = 0
-                try:
-                    if abs(float(raw or 0)) > 0:
-                        return True
-                except Exception:
-                    pass
-        return False
+                pass
+    return False
+
+def _kucoin_legs_open():
+    for bin_sym, kc_ccxt_sym in list(KUCOIN_CCXT_MAP.items()):
+        if not kc_ccxt_sym:
+            continue
+        pos = None
+        try:
+            pos = kucoin.fetch_positions([kc_ccxt_sym])
+        except Exception:
+            try:
+                allp = kucoin.fetch_positions()
+                for p in allp:
+                    if p.get('symbol') == kc_ccxt_sym:
+                        pos = [p]
+                        break
+            except Exception:
+                pos = None
+        if pos:
+            raw = None
+            try:
+                raw = pos[0].get('contracts') or pos[0].get('positionAmt') or pos[0].get('info', {}).get('currentQty') or 0
+            except Exception:
+                raw = 0
+            try:
+                if abs(float(raw or 0)) > 0:
+                    return True
+            except Exception:
+                pass
+    return False
+
+def has_open_positions():
+    # the two venues are checked concurrently; any error counts as "open" so nothing is torn down early
+    try:
+        f_kc = _order_pool.submit(_kucoin_legs_open)
+        bin_open = _binance_legs_open()
+        return bin_open or f_kc.result()
     except Exception:
         return True
 
@@ -393,7 +741,7 @@ def close_single_exchange_position(exchange, symbol):
             except Exception:
                 pos_list = []
         if not pos_list:
-            print(f"{datetime.now().isoformat()} No positions returned for {exchange.id} {symbol} (treated as already closed).")
+            console_print(f"{datetime.now().isoformat()} No positions returned for {exchange.id} {symbol} (treated as already closed).")
             return True
         pos = pos_list[0]
         raw_signed = None
@@ -407,132 +755,125 @@ def close_single_exchange_position(exchange, symbol):
 
         raw_signed = float(raw_signed or 0.0)
         if abs(raw_signed) == 0:
-            print(f"{datetime.now().isoformat()} No open qty to close for {exchange.id} {symbol}.")
+            console_print(f"{datetime.now().isoformat()} No open qty to close for {exchange.id} {symbol}.")
             return True
 
         side = 'sell' if raw_signed > 0 else 'buy'
         qty = abs(raw_signed)
-        market = get_market(exchange, symbol)
-        prec = market.get('precision', {}).get('amount') if market else None
+        prec = get_market_meta(exchange, symbol)[0]
         qty_rounded = round_down(qty, prec) if prec is not None else qty
         if qty_rounded > 0:
             try:
-                print(f"{datetime.now().isoformat()} Submitting targeted reduceOnly market close on {exchange.id} {symbol} -> {side} {qty_rounded}")
-                try:
-                    exchange.create_market_order(symbol, side, qty_rounded, params={'reduceOnly': True, 'marginMode': 'cross'})
-                except TypeError:
-                    exchange.create_order(symbol=symbol, type='market', side=side, amount=qty_rounded, params={'reduceOnly': True})
-                print(f"{datetime.now().isoformat()} Targeted reduceOnly close submitted on {exchange.id} {symbol}")
+                console_print(f"{datetime.now().isoformat()} Submitting targeted reduceOnly market close on {exchange.id} {symbol} -> {side} {qty_rounded}")
+                if exchange.id == 'binance':
+                    _create_market_order_fast(exchange, symbol, side, qty_rounded, reduce_only=True)
+                else:
+                    try:
+                        exchange.create_market_order(symbol, side, qty_rounded, params={'reduceOnly': True, 'marginMode': 'cross'})
+                    except TypeError:
+                        exchange.create_order(symbol=symbol, type='market', side=side, amount=qty_rounded, params={'reduceOnly': True})
+                console_print(f"{datetime.now().isoformat()} Targeted reduceOnly close submitted on {exchange.id} {symbol}")
                 return True
             except Exception as e:
                 err_text = str(e)
-                print(f"{datetime.now().isoformat()} Targeted reduceOnly close failed on {exchange.id} {symbol}: {err_text}")
+                console_print(f"{datetime.now().isoformat()} Targeted reduceOnly close failed on {exchange.id} {symbol}: {err_text}")
                 try:
-                    print(f"{datetime.now().isoformat()} Trying closePosition fallback on {exchange.id} {symbol}")
+                    console_print(f"{datetime.now().isoformat()} Trying closePosition fallback on {exchange.id} {symbol}")
                     try:
                         exchange.create_order(symbol=symbol, type='market', side=side, amount=None, params={'closePosition': True})
                     except TypeError:
                         exchange.create_order(symbol, 'market', side, params={'closePosition': True})
-                    print(f"{datetime.now().isoformat()} closePosition fallback submitted on {exchange.id} {symbol}")
+                    console_print(f"{datetime.now().isoformat()} closePosition fallback submitted on {exchange.id} {symbol}")
                     return True
                 except Exception as e2:
-                    print(f"{datetime.now().isoformat()} closePosition fallback failed on {exchange.id} {symbol}: {e2}")
+                    console_print(f"{datetime.now().isoformat()} closePosition fallback failed on {exchange.id} {symbol}: {e2}")
                     return False
         else:
             try:
-                print(f"{datetime.now().isoformat()} qty rounded to 0, using closePosition fallback on {exchange.id} {symbol}")
+                console_print(f"{datetime.now().isoformat()} qty rounded to 0, using closePosition fallback on {exchange.id} {symbol}")
                 try:
                     exchange.create_order(symbol=symbol, type='market', side=side, amount=None, params={'closePosition': True})
                 except TypeError:
                     exchange.create_order(symbol, 'market', side, params={'closePosition': True})
-                print(f"{datetime.now().isoformat()} closePosition fallback submitted on {exchange.id} {symbol}")
+                console_print(f"{datetime.now().isoformat()} closePosition fallback submitted on {exchange.id} {symbol}")
                 return True
             except Exception as e:
-                print(f"{datetime.now().isoformat()} closePosition fallback failed on {exchange.id} {symbol}: {e}")
+                console_print(f"{datetime.now().isoformat()} closePosition fallback failed on {exchange.id} {symbol}: {e}")
                 return False
     except Exception as e:
-        print(f"{datetime.now().isoformat()} Error in close_single_exchange_position({exchange.id},{symbol}): {e}")
+        console_print(f"{datetime.now().isoformat()} Error in close_single_exchange_position({exchange.id},{symbol}): {e}")
         return False
 
-def close_all_and_wait(timeout_s=20, poll_interval=0.5):
-    global closing_in_progress
-    closing_in_progress = True
-    print("\n" + "="*72)
-    print("Closing all positions...")
-    print("="*72)
-
+def _close_binance_legs():
     for sym in list(TRADED_BINANCE_SYMBOLS):
         try:
             positions_bin = binance.fetch_positions([sym])
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance fetched positions for {sym}: {positions_bin}")
+            console_print(f"{now_hms_ms()} Binance fetched positions for {sym}: {positions_bin}")
         except Exception as e:
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance fetch_positions error for {sym}: {e}")
+            console_print(f"{now_hms_ms()} Binance fetch_positions error for {sym}: {e}")
             positions_bin = None
 
         if positions_bin:
             pos = positions_bin[0]
             try:
                 raw_info = pos.get('info') if isinstance(pos, dict) else None
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance position raw info for {sym}: {raw_info}")
+                console_print(f"{now_hms_ms()} Binance position raw info for {sym}: {raw_info}")
             except Exception:
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance position raw info unavailable for {sym}")
+                console_print(f"{now_hms_ms()} Binance position raw info unavailable for {sym}")
 
             raw_signed = _get_signed_position_amount(pos)
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance raw positionAmt (signed) for {sym}: {raw_signed}")
+            console_print(f"{now_hms_ms()} Binance raw positionAmt (signed) for {sym}: {raw_signed}")
             if abs(raw_signed) > 0:
                 side = 'sell' if raw_signed > 0 else 'buy'
-                market = get_market(binance, sym)
-                prec = market.get('precision', {}).get('amount') if market else None
+                prec = get_market_meta(binance, sym)[0]
                 qty = round_down(abs(raw_signed), prec) if prec is not None else abs(raw_signed)
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance qty to close for {sym}: {qty} (precision={prec})")
+                console_print(f"{now_hms_ms()} Binance qty to close for {sym}: {qty} (precision={prec})")
 
                 if qty > 0:
                     try:
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Attempting Binance qty-based reduceOnly close for {sym} -> {side} {qty}")
-                        try:
-                            binance.create_market_order(sym, side, qty, params={'reduceOnly': True})
-                        except TypeError:
-                            binance.create_order(symbol=sym, type='market', side=side, amount=qty, params={'reduceOnly': True})
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Binance qty-based reduceOnly close submitted for {sym}")
+                        console_print(f"{now_hms_ms()} Attempting Binance qty-based reduceOnly close for {sym} -> {side} {qty}")
+                        _create_market_order_fast(binance, sym, side, qty, reduce_only=True)
+                        console_print(f"{now_hms_ms()} Binance qty-based reduceOnly close submitted for {sym}")
                     except Exception as e:
                         err_text = str(e)
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} BINANCE qty close failed for {sym}: {err_text}")
+                        console_print(f"{now_hms_ms()} BINANCE qty close failed for {sym}: {err_text}")
                         if 'ReduceOnly' in err_text or 'reduceOnly' in err_text.lower() or 'Reduce only' in err_text or '"code":-2022' in err_text or '-2022' in err_text:
                             try:
-                                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Detected ReduceOnly rejection, attempting Binance closePosition=True fallback for {sym}")
+                                console_print(f"{now_hms_ms()} Detected ReduceOnly rejection, attempting Binance closePosition=True fallback for {sym}")
                                 try:
                                     binance.create_order(symbol=sym, type='market', side=side, amount=None, params={'closePosition': True})
                                 except TypeError:
                                     binance.create_order(symbol=sym, type='market', side=side, params={'closePosition': True})
-                                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} BINANCE closePosition fallback submitted for {sym}")
+                                console_print(f"{now_hms_ms()} BINANCE closePosition fallback submitted for {sym}")
                             except Exception as e2:
-                                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} BINANCE closePosition fallback failed for {sym}: {e2}")
+                                console_print(f"{now_hms_ms()} BINANCE closePosition fallback failed for {sym}: {e2}")
                         else:
-                            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} BINANCE close failed for {sym} with unexpected error: {e}")
+                            console_print(f"{now_hms_ms()} BINANCE close failed for {sym} with unexpected error: {e}")
                 else:
                     try:
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} qty<=0, using closePosition=True for Binance {sym}")
+                        console_print(f"{now_hms_ms()} qty<=0, using closePosition=True for Binance {sym}")
                         try:
                             binance.create_order(symbol=sym, type='market', side=side, amount=None, params={'closePosition': True})
                         except TypeError:
                             binance.create_order(symbol=sym, type='market', side=side, params={'closePosition': True})
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} BINANCE closePosition submitted for {sym}")
+                        console_print(f"{now_hms_ms()} BINANCE closePosition submitted for {sym}")
                     except Exception as e:
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} BINANCE closePosition failed for {sym}: {e}")
+                        console_print(f"{now_hms_ms()} BINANCE closePosition failed for {sym}: {e}")
 
         time.sleep(0.15)
 
+def _close_kucoin_legs():
     all_kc_positions = []
     try:
         kc_syms = list(set([s for s in KUCOIN_CCXT_MAP.values() if s]))
         if kc_syms:
             all_kc_positions = kucoin.fetch_positions(symbols=kc_syms)
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} KuCoin fetched all positions: {all_kc_positions}")
+            console_print(f"{now_hms_ms()} KuCoin fetched all positions: {all_kc_positions}")
     except Exception as e:
-        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Error fetching KuCoin positions via ccxt: {e}")
+        console_print(f"{now_hms_ms()} Error fetching KuCoin positions via ccxt: {e}")
 
     if not all_kc_positions:
-        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} No open positions found on KuCoin via ccxt.")
+        console_print(f"{now_hms_ms()} No open positions found on KuCoin via ccxt.")
     else:
         for pos in all_kc_positions:
             ccxt_sym = pos.get('symbol')
@@ -550,39 +891,66 @@ def close_all_and_wait(timeout_s=20, poll_interval=0.5):
             if abs(raw_qty_signed) == 0:
                 continue
             if ccxt_sym not in list(KUCOIN_CCXT_MAP.values()):
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Skipping KuCoin position for untracked symbol: {ccxt_sym}")
+                console_print(f"{now_hms_ms()} Skipping KuCoin position for untracked symbol: {ccxt_sym}")
                 continue
             side = 'sell' if raw_qty_signed > 0 else 'buy'
             qty = abs(raw_qty_signed)
-            market = get_market(kucoin, ccxt_sym)
-            prec = market.get('precision', {}).get('amount') if market else None
+            prec = get_market_meta(kucoin, ccxt_sym)[0]
             qty = round_down(qty, prec) if prec is not None else qty
             if qty > 0:
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Closing KuCoin {ccxt_sym} {side} {qty} (raw_qty_signed={raw_qty_signed})")
+                console_print(f"{now_hms_ms()} Closing KuCoin {ccxt_sym} {side} {qty} (raw_qty_signed={raw_qty_signed})")
                 try:
                     kucoin.create_market_order(ccxt_sym, side, qty, params={'reduceOnly': True, 'marginMode': 'cross'})
-                    print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} KuCoin close order submitted for {ccxt_sym}")
+                    console_print(f"{now_hms_ms()} KuCoin close order submitted for {ccxt_sym}")
                 except Exception as e:
-                    print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} KUCOIN close order failed for {ccxt_sym}: {e}")
+                    console_print(f"{now_hms_ms()} KUCOIN close order failed for {ccxt_sym}: {e}")
+
+def close_all_and_wait(timeout_s=20, poll_interval=0.5):
+    global closing_in_progress
+    closing_in_progress = True
+    console_print("\n" + "="*72)
+    console_print("Closing all positions...")
+    console_print("="*72)
+
+    # the venues are independent, so unwind both at once: the naked window is max(RTT) not the sum
+    f_kc = _order_pool.submit(_close_kucoin_legs)
+    try:
+        _close_binance_legs()
+    finally:
+        wait([f_kc])
+    if f_kc.exception() is not None:
+        console_print(f"{now_hms_ms()} KuCoin close pass raised: {f_kc.exception()}")
 
     start = time.time()
+    last_rest = time.monotonic()
     while time.time() - start < timeout_s:
-        open_now = has_open_positions()
-        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Checking open positions... has_open_positions() => {open_now}")
+        # a pushed non-zero leg lets a poll skip REST, but only for CLOSE_REST_CHECK_S: a stale push
+        # (missed flat update) must not hold the close open until the timeout. Pushed-flat (or no
+        # stream data) is always confirmed by has_open_positions() before any state is torn down.
+        if _ws_positions_flat() is False and time.monotonic() - last_rest < CLOSE_REST_CHECK_S:
+            open_now = True
+            console_print(f"{now_hms_ms()} Checking open positions... position stream => still open")
+        else:
+            open_now = has_open_positions()
+            last_rest = time.monotonic()
+            console_print(f"{now_hms_ms()} Checking open positions... has_open_positions() => {open_now}")
         if not open_now:
             closing_in_progress = False
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} All positions closed and confirmed.")
+            console_print(f"{now_hms_ms()} All positions closed and confirmed.")
             total_bal, bin_bal, kc_bal = get_total_futures_balance()
-            print(f"*** POST-TRADE Total Balance: ${total_bal:.2f} (Binance: ${bin_bal:.2f} | KuCoin: ${kc_bal:.2f}) ***")
-            print("="*72)
+            console_print(f"*** POST-TRADE Total Balance: ${total_bal:.2f} (Binance: ${bin_bal:.2f} | KuCoin: ${kc_bal:.2f}) ***")
+            console_print("="*72)
             with state_lock:
                 for sym in list(TRADED_BINANCE_SYMBOLS):
                     positions.pop(sym, None)
                     entry_confirm_count.pop(sym, None)
+                    entry_first_seen_ns.pop(sym, None)
                     exit_confirm_count.pop(sym, None)
+                    exit_first_seen_ns.pop(sym, None)
                     entry_prices.pop(sym, None)
                     entry_actual.pop(sym, None)
                     entry_spreads.pop(sym, None)
+                    entry_params.pop(sym, None)
                     KUCOIN_RAW_MAP.pop(sym, None)
                     KUCOIN_CCXT_MAP.pop(sym, None)
                     try:
@@ -590,14 +958,30 @@ def close_all_and_wait(timeout_s=20, poll_interval=0.5):
                     except Exception:
                         pass
             return True
-        time.sleep(poll_interval)
+        with position_cond:
+            position_cond.wait(poll_interval)
     closing_in_progress = False
-    print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Timeout waiting for positions to close.")
-    print("="*72)
+    console_print(f"{now_hms_ms()} Timeout waiting for positions to close.")
+    console_print("="*72)
     return False
 
 # -------------------- Execution confirmation helper (unchanged) --------------------
+def _ms_to_iso(ts_ms):
+    # log-only rendering of an integer fill time: one gmtime + strftime, fixed millisecond width
+    # (datetime.isoformat drops the fraction entirely when it is zero)
+    sec, ms = divmod(int(ts_ms), 1000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec))}.{ms:03d}Z"
+
+def _utc_ms(dt):
+    # trigger times are naive utcnow() values; pin them to UTC so .timestamp() does not apply the
+    # host's local offset (exchange fill times are true epoch ms)
+    return int(dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
 def extract_executed_price_and_time(exchange, symbol, order_obj):
+    """
+    Returns (exec_price, exec_time_iso, exec_time_ms). The epoch-ms value is kept alongside the ISO
+    string so callers can do latency arithmetic on integers instead of re-parsing it.
+    """
     try:
         if isinstance(order_obj, dict):
             avg = order_obj.get('average') or order_obj.get('price')
@@ -615,11 +999,11 @@ def extract_executed_price_and_time(exchange, symbol, order_obj):
                             ts_ms = ts_int * 1000
                         else:
                             ts_ms = int(time.time() * 1000)
-                        iso = datetime.utcfromtimestamp(ts_ms/1000.0).isoformat() + 'Z'
-                        return float(avg), iso
+                        return float(avg), _ms_to_iso(ts_ms), ts_ms
                     except Exception:
                         pass
-                return float(avg), datetime.utcnow().isoformat() + 'Z'
+                ts_ms = int(time.time() * 1000)
+                return float(avg), _ms_to_iso(ts_ms), ts_ms
     except Exception:
         pass
     try:
@@ -635,11 +1019,23 @@ def extract_executed_price_and_time(exchange, symbol, order_obj):
                         ts_ms = int(ts)
                         if ts_ms < 1e12 and ts_ms > 1e9:
                             ts_ms = ts_ms * 1000
-                        iso = datetime.utcfromtimestamp(ts_ms/1000.0).isoformat() + 'Z'
-                        return float(px), iso
+                        return float(px), _ms_to_iso(ts_ms), ts_ms
                     except Exception:
                         pass
-                return float(px), datetime.utcfromtimestamp((t.get('timestamp') or int(time.time() * 1000))/1000.0).isoformat() + 'Z'
+                ts_ms = t.get('timestamp') or int(time.time() * 1000)
+                return float(px), _ms_to_iso(ts_ms), ts_ms
+    except Exception:
+        pass
+    try:
+        # the last resort is only a mid estimate; a fresh pushed top-of-book gives it without a REST call
+        if exchange.id == 'binance':
+            q = ws_quote(ws_bin_prices, symbol)
+        else:
+            m = get_market(exchange, symbol)
+            q = ws_quote(ws_kc_prices, m['id']) if m else None
+        if q:
+            ts_ms = int(time.time() * 1000)
+            return (q[0] + q[1]) / 2.0, _ms_to_iso(ts_ms), ts_ms
     except Exception:
         pass
     try:
@@ -653,10 +1049,11 @@ def extract_executed_price_and_time(exchange, symbol, order_obj):
             elif t.get('last'):
                 mid = float(t.get('last'))
         if mid:
-            return float(mid), datetime.utcnow().isoformat() + 'Z'
+            ts_ms = int(time.time() * 1000)
+            return float(mid), _ms_to_iso(ts_ms), ts_ms
     except Exception:
         pass
-    return None, None
+    return None, None, None
 
 # -------------------- Verification helper: confirm position exists after market order --------------------
 def _verify_position_open_for_exchange(exchange, ccxt_symbol, side, timeout_s=6.0, poll_interval=0.5):
@@ -689,6 +1086,43 @@ def _verify_position_open_for_exchange(exchange, ccxt_symbol, side, timeout_s=6.
         time.sleep(poll_interval)
     return False, 0.0
 
+# -------------------- Fast market-order path --------------------
+# Binance symbol -> (market id, unified symbol, amount decimals): the static part of every raw order
+_BIN_ORDER_SPEC = {}
+
+def _create_market_order_fast(exchange, symbol, side, amount, reduce_only=False):
+    """
+    Binance market orders go straight to ccxt's raw fapiPrivatePostOrder endpoint with the market id
+    resolved from the cached markets, skipping the unified create_order layer (param/market
+    validation and full response parsing). ccxt still signs the request and reuses its keep-alive
+    session. Returns a dict carrying the unified fields extract_executed_price_and_time reads.
+    Other exchanges (or an unknown market) use the unified call. reduce_only is for the close paths.
+    """
+    spec = _BIN_ORDER_SPEC.get(symbol) if exchange.id == 'binance' else None
+    if spec is None:
+        market = get_market(exchange, symbol) if exchange.id == 'binance' else None
+        if not market:
+            return exchange.create_order(symbol, 'market', side, amount, None, {'reduceOnly': True} if reduce_only else {})
+        spec = _BIN_ORDER_SPEC[symbol] = (market['id'], market['symbol'], get_market_meta(exchange, symbol)[0])
+    market_id, unified, prec = spec
+    if prec is not None:
+        # truncate-then-format matches amount_to_precision's TRUNCATE without its string-math path
+        qty = f"{round_down(amount, prec):.{prec}f}"
+    else:
+        qty = exchange.amount_to_precision(unified, amount)
+    req = {
+        'symbol': market_id,
+        'side': side.upper(),
+        'type': 'MARKET',
+        'quantity': qty,
+        'newOrderRespType': 'RESULT',
+    }
+    if reduce_only:
+        req['reduceOnly'] = 'true'
+    raw = exchange.fapiPrivatePostOrder(req)
+    avg = float(raw.get('avgPrice') or 0) or None
+    return {'id': raw.get('orderId'), 'average': avg, 'timestamp': raw.get('updateTime'), 'info': raw}
+
 # -------------------- Improved safe_create_order with verbose error logging + post-order verification --------------------
 def safe_create_order(exchange, side, notional, price, symbol, trigger_time=None, trigger_price=None, retries=3):
     """
@@ -701,19 +1135,18 @@ def safe_create_order(exchange, side, notional, price, symbol, trigger_time=None
     amt, _, _, prec = compute_amount_for_notional(exchange, symbol, notional, price)
     amt = round_down(amt, prec) if prec is not None else amt
     if amt <= 0:
-        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} computed amt <=0, skipping order for {exchange.id} {symbol} (notional=${notional} price={price})")
+        console_print(f"{now_hms_ms()} computed amt <=0, skipping order for {exchange.id} {symbol} (notional=${notional} price={price})")
         return False, None, None
     last_exception = None
+    # trigger_time is fixed for the whole call; convert it to epoch ms once instead of per attempt.
+    trigger_ms = _utc_ms(trigger_time) if trigger_time is not None else None
     for attempt in range(1, retries + 1):
         try:
-            sent_time = datetime.utcnow()
+            sent_ns = time.monotonic_ns()
             order = None
             try:
                 if exchange.id == 'binance':
-                    if side.lower() == 'buy':
-                        order = exchange.create_market_buy_order(symbol, amt)
-                    else:
-                        order = exchange.create_market_sell_order(symbol, amt)
+                    order = _create_market_order_fast(exchange, symbol, side.lower(), amt)
                 else:
                     params = {'leverage': LEVERAGE, 'marginMode': 'cross'}
                     if side.lower() == 'buy':
@@ -722,28 +1155,26 @@ def safe_create_order(exchange, side, notional, price, symbol, trigger_time=None
                         order = exchange.create_market_sell_order(symbol, amt, params=params)
             except Exception as e:
                 # log detailed error body if available (KuCoin may return margin-related errors here)
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} create order exception (attempt {attempt}/{retries}): {repr(e)}")
+                console_print(f"{now_hms_ms()} {exchange.id.upper()} create order exception (attempt {attempt}/{retries}): {repr(e)}")
                 traceback.print_exc()
                 last_exception = e
                 time.sleep(0.25 * attempt)
                 continue
 
-            exec_price, exec_time = extract_executed_price_and_time(exchange, symbol, order)
+            # submit round-trip measured on the monotonic clock (immune to wall-clock steps)
+            rtt_ms = (time.monotonic_ns() - sent_ns) // 1_000_000
+
+            exec_price, exec_time, exec_ms = extract_executed_price_and_time(exchange, symbol, order)
             if exec_price is None and attempt < retries:
                 time.sleep(0.4)
-                exec_price, exec_time = extract_executed_price_and_time(exchange, symbol, order)
+                exec_price, exec_time, exec_ms = extract_executed_price_and_time(exchange, symbol, order)
 
             slippage = None
             latency_ms = None
             if trigger_price is not None and exec_price is not None:
                 slippage = exec_price - float(trigger_price)
-            if trigger_time is not None and exec_time is not None:
-                try:
-                    t0_ms = int(trigger_time.timestamp() * 1000)
-                    t1_ms = int(datetime.fromisoformat(exec_time.replace('Z', '')).timestamp() * 1000)
-                    latency_ms = t1_ms - t0_ms
-                except Exception:
-                    latency_ms = None
+            if trigger_ms is not None and exec_ms is not None:
+                latency_ms = exec_ms - trigger_ms
 
             if exec_price is not None:
                 # For KuCoin (and kucoinfutures) do an explicit poll to confirm the position exists
@@ -751,59 +1182,41 @@ def safe_create_order(exchange, side, notional, price, symbol, trigger_time=None
                     ok_pos, qty_signed = _verify_position_open_for_exchange(exchange, symbol, side, timeout_s=6.0, poll_interval=0.5)
                     if not ok_pos:
                         # Position didn't appear — treat as failure (exchange likely rejected due to margin).
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} ORDER APPEARED EXECUTED BUT NO POSITION FOUND for {symbol} | treating as failed. exec_price={exec_price} exec_time={exec_time} slippage={slippage} latency_ms={latency_ms}")
+                        console_print(f"{now_hms_ms()} {exchange.id.upper()} ORDER APPEARED EXECUTED BUT NO POSITION FOUND for {symbol} | treating as failed. exec_price={exec_price} exec_time={exec_time} slippage={slippage} latency_ms={latency_ms}")
                         # record last_exception for logging
                         last_exception = Exception("No position detected after KuCoin market order — possible margin rejection / silent failure")
                         # Attempt to surface logs: fetch recent orders/trades
                         try:
                             recent_orders = exchange.fetch_open_orders(symbol)
-                            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} open orders for {symbol}: {recent_orders}")
+                            console_print(f"{now_hms_ms()} {exchange.id.upper()} open orders for {symbol}: {recent_orders}")
                         except Exception:
                             pass
                         # do NOT leave the caller thinking this succeeded
                         return False, None, None
                     else:
-                        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} ORDER EXECUTED & POSITION CONFIRMED | {side.upper()} {amt} {symbol} | exec_price={exec_price} exec_time={exec_time} qty_signed={qty_signed} slippage={slippage} latency_ms={latency_ms}")
+                        console_print(f"{now_hms_ms()} {exchange.id.upper()} ORDER EXECUTED & POSITION CONFIRMED | {side.upper()} {amt} {symbol} | exec_price={exec_price} exec_time={exec_time} qty_signed={qty_signed} slippage={slippage} latency_ms={latency_ms} rtt_ms={rtt_ms}")
                         return True, exec_price, exec_time
                 else:
-                    print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} ORDER EXECUTED | {side.upper()} {amt} {symbol} at market | exec_price={exec_price} exec_time={exec_time} slippage={slippage} latency_ms={latency_ms}")
+                    console_print(f"{now_hms_ms()} {exchange.id.upper()} ORDER EXECUTED | {side.upper()} {amt} {symbol} at market | exec_price={exec_price} exec_time={exec_time} slippage={slippage} latency_ms={latency_ms} rtt_ms={rtt_ms}")
                     return True, exec_price, exec_time
             else:
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} order submitted but exec price/time unknown (attempt {attempt}/{retries}). Will retry if attempts remain.")
+                console_print(f"{now_hms_ms()} {exchange.id.upper()} order submitted but exec price/time unknown (attempt {attempt}/{retries}). Will retry if attempts remain.")
                 last_exception = Exception("No executed price/time found after order submission")
                 time.sleep(0.25)
                 continue
         except Exception as e:
             last_exception = e
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} order failed attempt {attempt}/{retries}: {repr(e)}")
+            console_print(f"{now_hms_ms()} {exchange.id.upper()} order failed attempt {attempt}/{retries}: {repr(e)}")
             traceback.print_exc()
             time.sleep(0.25 * attempt)
             continue
-    print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {exchange.id.upper()} order ultimately failed after {retries} attempts: {repr(last_exception)}")
+    console_print(f"{now_hms_ms()} {exchange.id.upper()} order ultimately failed after {retries} attempts: {repr(last_exception)}")
     return False, None, None
 
 # -------------------- Notional matching helper (kept) --------------------
 def match_base_exposure_per_exchange(bin_exchange, kc_exchange, bin_symbol, kc_symbol, desired_usdt, bin_price, kc_price):
-    m_bin = get_market(bin_exchange, bin_symbol)
-    m_kc = get_market(kc_exchange, kc_symbol)
-    bin_prec = None
-    kc_prec = None
-    bin_contract_size = 1.0
-    kc_contract_size = 1.0
-    try:
-        if m_bin:
-            prec = m_bin.get('precision')
-            if isinstance(prec, dict): bin_prec = prec.get('amount')
-            bin_contract_size = float(m_bin.get('contractSize') or m_bin.get('info', {}).get('contractSize') or 1.0)
-    except Exception:
-        pass
-    try:
-        if m_kc:
-            prec = m_kc.get('precision')
-            if isinstance(prec, dict): kc_prec = prec.get('amount')
-            kc_contract_size = float(m_kc.get('contractSize') or m_kc.get('info', {}).get('contractSize') or 1.0)
-    except Exception:
-        pass
+    bin_prec, bin_contract_size = get_market_meta(bin_exchange, bin_symbol)
+    kc_prec, kc_contract_size = get_market_meta(kc_exchange, kc_symbol)
     try:
         ref_price = (float(bin_price) + float(kc_price)) / 2.0
         if ref_price <= 0:
@@ -835,22 +1248,369 @@ def match_base_exposure_per_exchange(bin_exchange, kc_exchange, bin_symbol, kc_s
         notional_kc = kc_contracts * float(kc_contract_size) * float(kc_price)
     return float(notional_bin), float(notional_kc), float(bin_base_amount), float(kc_contracts)
 
+# -------------------- WebSocket book-ticker feed --------------------
+# Binance <sym>@bookTicker and KuCoin futures tickerV2 pushes land in ws_bin_prices / ws_kc_prices
+# as (bid, ask, monotonic_ns). Consumers declare what they need via ws_watch(owner, ...) and read
+# with ws_quote(), which returns None for missing/stale quotes so callers fall back to REST.
+ws_bin_prices = {}
+ws_kc_prices = {}
+_ws_watchers = {}
+_ws_subscribed = {'binance': set(), 'kucoin': set()}
+_ws_apps = {}
+_ws_lock = threading.Lock()
+_ws_req_id = itertools.count(1)
+# notified on every pushed quote so pollers can sleep until fresh data instead of a fixed interval
+price_cond = threading.Condition()
+# bumped under price_cond on every notify, so a waiter can tell whether a tick landed since it last looked
+_price_seq = 0
+
+def _notify_price_update():
+    global _price_seq
+    with price_cond:
+        _price_seq += 1
+        price_cond.notify_all()
+
+def _ws_store_quote(cache, key, bid, ask):
+    # Book tickers also push on size-only changes; those just refresh the timestamp. Waiters are
+    # woken only when the top-of-book prices move, i.e. when a spread can actually have changed.
+    prev = cache.get(key)
+    cache[key] = (bid, ask, time.monotonic_ns())
+    if prev is None or prev[0] != bid or prev[1] != ask:
+        _notify_price_update()
+
+def ws_quote(cache, key):
+    q = cache.get(key)
+    if q is None or (time.monotonic_ns() - q[2]) > WS_STALE_MS * 1_000_000:
+        return None
+    return q[0], q[1]
+
+def _ws_send_binance(method, syms):
+    app = _ws_apps.get('binance')
+    if app is None or not syms:
+        return
+    try:
+        app.send(json.dumps({"method": method, "params": [f"{s.lower()}@bookTicker" for s in syms], "id": next(_ws_req_id)}))
+    except Exception as e:
+        logger.debug("[WS_BINANCE] %s failed: %s", method, e)
+
+def _ws_send_kucoin(kind, syms):
+    app = _ws_apps.get('kucoin')
+    if app is None:
+        return
+    for s in syms:
+        try:
+            app.send(json.dumps({"id": str(next(_ws_req_id)), "type": kind, "topic": f"/contractMarket/tickerV2:{s}", "privateChannel": False, "response": True}))
+        except Exception as e:
+            logger.debug("[WS_KUCOIN] %s %s failed: %s", kind, s, e)
+
+def ws_watch(owner, bin_symbols=(), kc_raw_symbols=()):
+    """
+    Replace the set of symbols `owner` wants pushed quotes for. Subscriptions are the union over
+    all owners; only the difference against what is already subscribed is sent to the venues.
+    """
+    if not WS_ENABLED:
+        return
+    with _ws_lock:
+        _ws_watchers[owner] = (set(bin_symbols), set(kc_raw_symbols))
+        want_bin = set().union(*(w[0] for w in _ws_watchers.values()))
+        want_kc = set().union(*(w[1] for w in _ws_watchers.values()))
+        bin_add, bin_del = want_bin - _ws_subscribed['binance'], _ws_subscribed['binance'] - want_bin
+        kc_add, kc_del = want_kc - _ws_subscribed['kucoin'], _ws_subscribed['kucoin'] - want_kc
+        _ws_subscribed['binance'] = want_bin
+        _ws_subscribed['kucoin'] = want_kc
+    _ws_send_binance("SUBSCRIBE", sorted(bin_add))
+    _ws_send_binance("UNSUBSCRIBE", sorted(bin_del))
+    _ws_send_kucoin("subscribe", sorted(kc_add))
+    _ws_send_kucoin("unsubscribe", sorted(kc_del))
+    for s in bin_del:
+        ws_bin_prices.pop(s, None)
+    for s in kc_del:
+        ws_kc_prices.pop(s, None)
+
+def _ws_run_binance():
+    def on_open(app):
+        with _ws_lock:
+            _ws_apps['binance'] = app
+            syms = sorted(_ws_subscribed['binance'])
+        _ws_send_binance("SUBSCRIBE", syms)
+        logger.info("[WS_BINANCE] connected (%d streams)", len(syms))
+
+    def on_message(app, msg):
+        d = _json_loads(msg)
+        if d.get('e') != 'bookTicker':
+            return
+        _ws_store_quote(ws_bin_prices, d['s'], float(d['b']), float(d['a']))
+
+    while True:
+        try:
+            app = websocket.WebSocketApp(BINANCE_WS_URL, on_open=on_open, on_message=on_message,
+                                         on_error=lambda app, e: logger.warning("[WS_BINANCE] error: %s", e))
+            app.run_forever(ping_interval=30, ping_timeout=10)
+        except Exception:
+            logger.exception("[WS_BINANCE] feed crashed")
+        _ws_apps.pop('binance', None)
+        time.sleep(2)
+
+def _ws_kucoin_pinger(app, interval, app_key):
+    # KuCoin drops connections that do not send an application-level ping every pingInterval.
+    while _ws_apps.get(app_key) is app:
+        time.sleep(interval)
+        try:
+            app.send(json.dumps({"id": str(next(_ws_req_id)), "type": "ping"}))
+        except Exception:
+            break
+
+def _ws_run_kucoin():
+    def on_open(app):
+        with _ws_lock:
+            _ws_apps['kucoin'] = app
+            syms = sorted(_ws_subscribed['kucoin'])
+        _ws_send_kucoin("subscribe", syms)
+        logger.info("[WS_KUCOIN] connected (%d topics)", len(syms))
+
+    def on_message(app, msg):
+        d = _json_loads(msg)
+        if d.get('type') != 'message' or d.get('subject') != 'tickerV2':
+            return
+        t = d.get('data') or {}
+        _ws_store_quote(ws_kc_prices, t['symbol'], float(t['bestBidPrice']), float(t['bestAskPrice']))
+
+    while True:
+        try:
+            bullet = _json_loads(http_session.post(KUCOIN_BULLET_URL, timeout=10).content)['data']
+            server = bullet['instanceServers'][0]
+            url = f"{server['endpoint']}?token={bullet['token']}&connectId={int(time.time() * 1000)}"
+            ping_s = max(5.0, float(server.get('pingInterval', 18000)) / 1000.0 * 0.8)
+
+            def on_open_with_ping(app):
+                on_open(app)
+                threading.Thread(target=_ws_kucoin_pinger, args=(app, ping_s, 'kucoin'), daemon=True).start()
+
+            app = websocket.WebSocketApp(url, on_open=on_open_with_ping, on_message=on_message,
+                                         on_error=lambda app, e: logger.warning("[WS_KUCOIN] error: %s", e))
+            app.run_forever()
+        except Exception:
+            logger.exception("[WS_KUCOIN] feed crashed")
+        _ws_apps.pop('kucoin', None)
+        time.sleep(2)
+
+# -------------------- Private position streams (liquidation watcher feed) --------------------
+# Binance user-data ACCOUNT_UPDATE and KuCoin /contract/position pushes keep ws_positions current:
+# ('binance', raw_id) / ('kucoin', raw_id) -> signed size. position_cond is notified on every update
+# so liquidation watchers wake immediately instead of waiting out their poll interval.
+ws_positions = {}
+position_cond = threading.Condition()
+_ws_private_ok = {'binance': False, 'kucoin': False}
+_ws_position_subs = set()
+
+def _notify_position_update():
+    with position_cond:
+        position_cond.notify_all()
+
+def _ws_clear_positions(venue):
+    # a (re)connected stream only pushes changes, so sizes cached from an earlier connection may be
+    # stale (a flat update can fall in the gap); drop them and let REST answer until new pushes land
+    for key in [k for k in list(ws_positions) if k[0] == venue]:
+        ws_positions.pop(key, None)
+
+def _ws_positions_flat():
+    """
+    What the private streams say about the tracked legs: True when every leg has pushed a zero size,
+    False when any pushed size is non-zero, None when a stream is down or a leg has not pushed yet.
+    """
+    if not (_ws_private_ok['binance'] and _ws_private_ok['kucoin']):
+        return None
+    unknown = False
+    for sym in list(TRADED_BINANCE_SYMBOLS):
+        kc_raw = KUCOIN_RAW_MAP.get(sym)
+        for key in (('binance', sym), ('kucoin', kc_raw)) if kc_raw else (('binance', sym),):
+            size = ws_positions.get(key)
+            if size is None:
+                unknown = True
+            elif size:
+                return False
+    return None if unknown else True
+
+def _ws_send_kucoin_private(kind, raw_ids):
+    app = _ws_apps.get('kucoin_private')
+    if app is None:
+        return
+    for s in raw_ids:
+        try:
+            app.send(json.dumps({"id": str(next(_ws_req_id)), "type": kind, "topic": f"/contract/position:{s}", "privateChannel": True, "response": True}))
+        except Exception as e:
+            logger.debug("[WS_KUCOIN_PRIVATE] %s %s failed: %s", kind, s, e)
+
+def ws_watch_position(kc_raw_id, on=True):
+    if not WS_ENABLED or not kc_raw_id:
+        return
+    with _ws_lock:
+        if on == (kc_raw_id in _ws_position_subs):
+            return
+        (_ws_position_subs.add if on else _ws_position_subs.discard)(kc_raw_id)
+    _ws_send_kucoin_private("subscribe" if on else "unsubscribe", [kc_raw_id])
+    if not on:
+        ws_positions.pop(('kucoin', kc_raw_id), None)
+
+def _ws_run_binance_user():
+    def on_open(app):
+        _ws_clear_positions('binance')
+        _ws_private_ok['binance'] = True
+        logger.info("[WS_BINANCE_USER] connected")
+
+    def on_message(app, msg):
+        d = _json_loads(msg)
+        ev = d.get('e')
+        if ev == 'ACCOUNT_UPDATE':
+            for p in (d.get('a') or {}).get('P') or []:
+                if p.get('ps', 'BOTH') == 'BOTH':
+                    ws_positions[('binance', p['s'])] = float(p['pa'])
+            _notify_position_update()
+        elif ev == 'listenKeyExpired':
+            app.close()
+
+    def keepalive(stop):
+        # listen keys expire after 60 minutes without a keepalive
+        while not stop.wait(30 * 60):
+            try:
+                binance.fapiPrivatePutListenKey()
+            except Exception as e:
+                logger.warning("[WS_BINANCE_USER] listenKey keepalive failed: %s", e)
+
+    while True:
+        stop = threading.Event()
+        try:
+            listen_key = binance.fapiPrivatePostListenKey()['listenKey']
+            threading.Thread(target=keepalive, args=(stop,), daemon=True).start()
+            app = websocket.WebSocketApp(f"{BINANCE_WS_URL}/{listen_key}", on_open=on_open, on_message=on_message,
+                                         on_error=lambda app, e: logger.warning("[WS_BINANCE_USER] error: %s", e))
+            app.run_forever(ping_interval=30, ping_timeout=10)
+        except Exception:
+            logger.exception("[WS_BINANCE_USER] stream crashed")
+        stop.set()
+        _ws_private_ok['binance'] = False
+        _ws_clear_positions('binance')
+        time.sleep(5)
+
+def _ws_run_kucoin_private():
+    def on_open(app):
+        with _ws_lock:
+            _ws_apps['kucoin_private'] = app
+            raw_ids = sorted(_ws_position_subs)
+        _ws_clear_positions('kucoin')
+        _ws_private_ok['kucoin'] = True
+        _ws_send_kucoin_private("subscribe", raw_ids)
+        logger.info("[WS_KUCOIN_PRIVATE] connected (%d position topics)", len(raw_ids))
+
+    def on_message(app, msg):
+        d = _json_loads(msg)
+        if d.get('type') != 'message' or d.get('subject') != 'position.change':
+            return
+        t = d.get('data') or {}
+        # mark-price variants of position.change carry no currentQty
+        if 'currentQty' in t:
+            raw_id = t.get('symbol') or d.get('topic', '').rsplit(':', 1)[-1]
+            ws_positions[('kucoin', raw_id)] = float(t['currentQty'])
+            _notify_position_update()
+
+    while True:
+        try:
+            bullet = kucoin.futuresPrivatePostBulletPrivate()['data']
+            server = bullet['instanceServers'][0]
+            url = f"{server['endpoint']}?token={bullet['token']}&connectId={int(time.time() * 1000)}"
+            ping_s = max(5.0, float(server.get('pingInterval', 18000)) / 1000.0 * 0.8)
+
+            def on_open_with_ping(app):
+                on_open(app)
+                threading.Thread(target=_ws_kucoin_pinger, args=(app, ping_s, 'kucoin_private'), daemon=True).start()
+
+            app = websocket.WebSocketApp(url, on_open=on_open_with_ping, on_message=on_message,
+                                         on_error=lambda app, e: logger.warning("[WS_KUCOIN_PRIVATE] error: %s", e))
+            app.run_forever()
+        except Exception:
+            logger.exception("[WS_KUCOIN_PRIVATE] stream crashed")
+        _ws_apps.pop('kucoin_private', None)
+        _ws_private_ok['kucoin'] = False
+        _ws_clear_positions('kucoin')
+        time.sleep(5)
+
+def start_ws_feeds():
+    if not WS_ENABLED:
+        return
+    threading.Thread(target=_ws_run_binance, name='ws-binance', daemon=True).start()
+    threading.Thread(target=_ws_run_kucoin, name='ws-kucoin', daemon=True).start()
+    threading.Thread(target=_ws_run_binance_user, name='ws-binance-user', daemon=True).start()
+    threading.Thread(target=_ws_run_kucoin_private, name='ws-kucoin-private', daemon=True).start()
+
+# Worker pool for the exit monitor's price polling. All ticker requests of one poll go out
+# concurrently over the shared pooled session, so a poll costs roughly one RTT instead of one
+# RTT per symbol plus a fresh TCP/TLS handshake per request.
+_price_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='prices')
+# last good REST quotes, same (bid, ask, monotonic_ns) layout as the WS caches so ws_quote()
+# applies the same staleness cut-off when a fetch times out
+_last_prices_bin = {}
+_last_prices_kc = {}
+
+def _fetch_binance_book_prices(bin_symbols):
+    out = {}
+    if len(bin_symbols) == 1:
+        # the usual exit-side miss is the one open symbol: ask for just it (a single small object,
+        # lower request weight) instead of downloading and scanning the full-universe payload
+        item = _json_loads(http_session.get(BINANCE_TICKER_URL.format(symbol=bin_symbols[0]), timeout=PRICE_TIMEOUT).content)
+        out[item['symbol']] = (float(item['bidPrice']), float(item['askPrice']))
+        return out
+    wanted = frozenset(bin_symbols)
+    data = _json_loads(http_session.get(BINANCE_BOOK_URL, timeout=PRICE_TIMEOUT).content)
+    # one pass over the full-universe payload, touching only the symbols we track
+    for item in data:
+        s = item['symbol']
+        if s in wanted:
+            out[s] = (float(item['bidPrice']), float(item['askPrice']))
+    return out
+
+def _fetch_kucoin_ticker_prices(raw_id):
+    resp = _json_loads(http_session.get(KUCOIN_TICKER_URL.format(symbol=raw_id), timeout=PRICE_TIMEOUT).content)
+    d = resp.get('data', {})
+    return float(d.get('bestBidPrice', '0') or 0), float(d.get('bestAskPrice', '0') or 0)
+
 def get_prices_for_symbols(bin_symbols, kucoin_raw_symbols):
     bin_prices = {}
     kc_prices = {}
-    try:
-        data = requests.get("https://fapi.binance.com/fapi/v1/ticker/bookTicker", timeout=5).json()
-        for s in bin_symbols:
-            for item in data:
-                if item['symbol'] == s:
-                    bin_prices[s] = (float(item['bidPrice']), float(item['askPrice']))
-                    break
-        for raw_id in kucoin_raw_symbols:
-            resp = requests.get(f"https://api-futures.kucoin.com/api/v1/ticker?symbol={raw_id}", timeout=5).json()
-            d = resp.get('data', {})
-            kc_prices[raw_id] = (float(d.get('bestBidPrice', '0') or 0), float(d.get('bestAskPrice', '0') or 0))
-    except Exception:
-        pass
+    # fresh WebSocket quotes first; REST only for what the feed does not cover
+    ws_watch('exit', bin_symbols, kucoin_raw_symbols)
+    for s in bin_symbols:
+        q = ws_quote(ws_bin_prices, s)
+        if q:
+            bin_prices[s] = q
+    for raw_id in kucoin_raw_symbols:
+        q = ws_quote(ws_kc_prices, raw_id)
+        if q:
+            kc_prices[raw_id] = q
+    bin_missing = [s for s in bin_symbols if s not in bin_prices]
+    kc_missing = [r for r in kucoin_raw_symbols if r not in kc_prices]
+    f_bin = _price_pool.submit(_fetch_binance_book_prices, bin_missing) if bin_missing else None
+    f_kc = {_price_pool.submit(_fetch_kucoin_ticker_prices, raw_id): raw_id for raw_id in kc_missing}
+    if f_bin is not None:
+        try:
+            fetched = f_bin.result()
+            now_ns = time.monotonic_ns()
+            for s, q in fetched.items():
+                _last_prices_bin[s] = (q[0], q[1], now_ns)
+            bin_prices.update(fetched)
+        except Exception:
+            for s in bin_missing:
+                q = ws_quote(_last_prices_bin, s)
+                if q:
+                    bin_prices[s] = q
+    for fut, raw_id in f_kc.items():
+        try:
+            q = fut.result()
+            _last_prices_kc[raw_id] = (q[0], q[1], time.monotonic_ns())
+            kc_prices[raw_id] = q
+        except Exception:
+            q = ws_quote(_last_prices_kc, raw_id)
+            if q:
+                kc_prices[raw_id] = q
     return bin_prices, kc_prices
 
 # -------------------- Liquidation watcher (kept) --------------------
@@ -862,7 +1622,7 @@ def _fetch_signed_binance(sym):
         pos = p[0]
         return _get_signed_from_binance_pos(pos)
     except Exception as e:
-        print(f"{datetime.utcnow().isoformat()} BINANCE fetch error for {sym}: {e}")
+        console_print(f"{datetime.utcnow().isoformat()} BINANCE fetch error for {sym}: {e}")
         return None
 
 def _fetch_signed_kucoin(ccxt_sym):
@@ -882,9 +1642,16 @@ def _fetch_signed_kucoin(ccxt_sym):
         pos = p[0]
         return _get_signed_from_kucoin_pos(pos)
     except Exception as e:
-        print(f"{datetime.utcnow().isoformat()} KUCOIN fetch error for {ccxt_sym}: {e}")
+        console_print(f"{datetime.utcnow().isoformat()} KUCOIN fetch error for {ccxt_sym}: {e}")
         return None
 
+def _fetch_signed_pair(bin_sym, kc_sym):
+    # both venues' REST position reads in flight at once: a watcher tick costs max(RTT), not the sum
+    f_kc = _price_pool.submit(_fetch_signed_kucoin, kc_sym) if kc_sym else None
+    cur_bin = _fetch_signed_binance(bin_sym)
+    cur_kc = f_kc.result() if f_kc else 0.0
+    return cur_bin, cur_kc
+
 def _start_liquidation_watcher_for_symbol(sym, bin_sym, kc_sym):
     if _liquidation_watchers.get(sym):
         return
@@ -892,8 +1659,12 @@ def _start_liquidation_watcher_for_symbol(sym, bin_sym, kc_sym):
     stop_flag = threading.Event()
     _liquidation_watchers[sym] = stop_flag
 
+    kc_raw = KUCOIN_RAW_MAP.get(sym)
+    ws_watch_position(kc_raw)
+
     def monitor():
-        print(f"{datetime.now().isoformat()} Liquidation watcher STARTED for {sym} (bin:{bin_sym} kc:{kc_sym})")
+        console_print(f"{datetime.now().isoformat()} Liquidation watcher STARTED for {sym} (bin:{bin_sym} kc:{kc_sym})")
+        reconcile_at = time.monotonic() + WATCHER_RECONCILE_S
         prev_bin = None
         prev_kc = None
         zero_cnt_bin = 0
@@ -901,8 +1672,7 @@ def _start_liquidation_watcher_for_symbol(sym, bin_sym, kc_sym):
         seen_nonzero_bin = False
         seen_nonzero_kc = False
 
-        wb = _fetch_signed_binance(bin_sym)
-        wk = _fetch_signed_kucoin(kc_sym) if kc_sym else 0.0
+        wb, wk = _fetch_signed_pair(bin_sym, kc_sym)
         prev_bin = wb if wb is not None else 0.0
         prev_kc = wk if wk is not None else 0.0
         if abs(prev_bin) > 1e-8:
@@ -917,16 +1687,26 @@ def _start_liquidation_watcher_for_symbol(sym, bin_sym, kc_sym):
                 if closing_in_progress or positions.get(sym) is None:
                     zero_cnt_bin = zero_cnt_kc = 0
                     if positions.get(sym) is None:
-                        print(f"{datetime.now().isoformat()} Liquidation watcher stopping for {sym} because positions[sym] is None")
+                        console_print(f"{datetime.now().isoformat()} Liquidation watcher stopping for {sym} because positions[sym] is None")
                         break
                     time.sleep(WATCHER_POLL_INTERVAL)
                     continue
 
-                cur_bin = _fetch_signed_binance(bin_sym)
-                cur_kc = _fetch_signed_kucoin(kc_sym) if kc_sym else 0.0
+                # While both private streams are live and report both legs open, trust the pushes and
+                # skip REST until the next reconciliation. Any pushed zero (or missing stream data)
+                # falls through to REST, so a close decision is always confirmed by the exchange.
+                ws_bin = ws_positions.get(('binance', bin_sym)) if _ws_private_ok['binance'] else None
+                ws_kc = ws_positions.get(('kucoin', kc_raw)) if (kc_sym and _ws_private_ok['kucoin']) else (0.0 if not kc_sym else None)
+                pushed_open = (ws_bin is not None and abs(ws_bin) > ZERO_ABS_THRESHOLD
+                               and (not kc_sym or (ws_kc is not None and abs(ws_kc) > ZERO_ABS_THRESHOLD)))
+                if pushed_open and time.monotonic() < reconcile_at:
+                    cur_bin, cur_kc = ws_bin, ws_kc
+                else:
+                    cur_bin, cur_kc = _fetch_signed_pair(bin_sym, kc_sym)
+                    reconcile_at = time.monotonic() + WATCHER_RECONCILE_S
 
                 if cur_bin is None or cur_kc is None:
-                    print(f"{datetime.now().isoformat()} WATCHER SKIP (transient fetch error) prev_bin={prev_bin} prev_kc={prev_kc} cur_bin={cur_bin} cur_kc={cur_kc} zero_cnt_bin={zero_cnt_bin} zero_cnt_kc={zero_cnt_kc}")
+                    console_print(f"{datetime.now().isoformat()} WATCHER SKIP (transient fetch error) prev_bin={prev_bin} prev_kc={prev_kc} cur_bin={cur_bin} cur_kc={cur_kc} zero_cnt_bin={zero_cnt_bin} zero_cnt_kc={zero_cnt_kc}")
                     time.sleep(WATCHER_POLL_INTERVAL)
                     continue
 
@@ -947,42 +1727,45 @@ def _start_liquidation_watcher_for_symbol(sym, bin_sym, kc_sym):
                     if seen_nonzero_kc:
                         zero_cnt_kc += 1
 
-                print(f"{datetime.now().isoformat()} WATCHER {sym} prev_bin={prev_bin:.6f} cur_bin={cur_bin:.6f} prev_kc={prev_kc:.6f} cur_kc={cur_kc:.6f} zero_cnt_bin={zero_cnt_bin}/{WATCHER_DETECT_CONFIRM} zero_cnt_kc={zero_cnt_kc}/{WATCHER_DETECT_CONFIRM}")
+                watcher_logger.debug("WATCHER %s prev_bin=%.6f cur_bin=%.6f prev_kc=%.6f cur_kc=%.6f zero_cnt_bin=%d/%d zero_cnt_kc=%d/%d",
+                                     sym, prev_bin, cur_bin, prev_kc, cur_kc, zero_cnt_bin, WATCHER_DETECT_CONFIRM, zero_cnt_kc, WATCHER_DETECT_CONFIRM)
 
                 if zero_cnt_bin >= WATCHER_DETECT_CONFIRM:
-                    print(f"{datetime.now().isoformat()} Detected sustained ZERO on Binance for {bin_sym} -> attempting targeted close of KuCoin and full cleanup.")
+                    console_print(f"{datetime.now().isoformat()} Detected sustained ZERO on Binance for {bin_sym} -> attempting targeted close of KuCoin and full cleanup.")
                     try:
                         ok = close_single_exchange_position(kucoin, kc_sym)
                         if not ok:
-                            print(f"{datetime.now().isoformat()} Targeted KuCoin close failed; falling back to global close.")
+                            console_print(f"{datetime.now().isoformat()} Targeted KuCoin close failed; falling back to global close.")
                         close_all_and_wait()
                     except Exception as e:
-                        print(f"{datetime.now().isoformat()} Error when closing after Binance zero: {e}")
+                        console_print(f"{datetime.now().isoformat()} Error when closing after Binance zero: {e}")
                     global terminate_bot
                     terminate_bot = True
                     break
 
                 if zero_cnt_kc >= WATCHER_DETECT_CONFIRM:
-                    print(f"{datetime.now().isoformat()} Detected sustained ZERO on KuCoin for {kc_sym} -> attempting targeted close of Binance and full cleanup.")
+                    console_print(f"{datetime.now().isoformat()} Detected sustained ZERO on KuCoin for {kc_sym} -> attempting targeted close of Binance and full cleanup.")
                     try:
                         ok = close_single_exchange_position(binance, bin_sym)
                         if not ok:
-                            print(f"{datetime.now().isoformat()} Targeted Binance close failed; falling back to global close.")
+                            console_print(f"{datetime.now().isoformat()} Targeted Binance close failed; falling back to global close.")
                         close_all_and_wait()
                     except Exception as e:
-                        print(f"{datetime.now().isoformat()} Error when closing after KuCoin zero: {e}")
+                        console_print(f"{datetime.now().isoformat()} Error when closing after KuCoin zero: {e}")
                     terminate_bot = True
                     break
 
                 prev_bin = cur_bin
                 prev_kc = cur_kc
-                time.sleep(WATCHER_POLL_INTERVAL)
+                with position_cond:
+                    position_cond.wait(WATCHER_POLL_INTERVAL)
             except Exception as e:
-                print(f"{datetime.now().isoformat()} Liquidation watcher exception for {sym}: {e}")
+                console_print(f"{datetime.now().isoformat()} Liquidation watcher exception for {sym}: {e}")
                 time.sleep(0.5)
 
         _liquidation_watchers.pop(sym, None)
-        print(f"{datetime.now().isoformat()} Liquidation watcher EXIT for {sym}")
+        ws_watch_position(kc_raw, on=False)
+        console_print(f"{datetime.now().isoformat()} Liquidation watcher EXIT for {sym}")
 
     t = threading.Thread(target=monitor, daemon=True)
     t.start()
@@ -1003,9 +1786,9 @@ def normalize(sym):
 def get_binance_symbols(retries=2):
     for attempt in range(1, retries + 1):
         try:
-            r = requests.get(BINANCE_INFO_URL, timeout=10)
+            r = http_session.get(BINANCE_INFO_URL, timeout=10)
             r.raise_for_status()
-            data = r.json()
+            data = _json_loads(r.content)
             syms = [s["symbol"] for s in data.get("symbols", [])
                     if s.get("contractType") == "PERPETUAL" and s.get("status") == "TRADING"]
             logger.debug("[BINANCE] fetched %d symbols (sample: %s)", len(syms), syms[:6])
@@ -1020,9 +1803,9 @@ def get_binance_symbols(retries=2):
 def get_kucoin_symbols(retries=2):
     for attempt in range(1, retries + 1):
         try:
-            r = requests.get(KUCOIN_ACTIVE_URL, timeout=10)
+            r = http_session.get(KUCOIN_ACTIVE_URL, timeout=10)
             r.raise_for_status()
-            data = r.json()
+            data = _json_loads(r.content)
             raw = data.get("data", []) if isinstance(data, dict) else []
             syms = [s["symbol"] for s in raw if s.get("status", "").lower() == "open"]
             logger.debug("[KUCOIN] fetched %d symbols (sample: %s)", len(syms), syms[:6])
@@ -1056,9 +1839,9 @@ def get_common_symbols():
 def get_binance_book(retries=1):
     for attempt in range(1, retries+1):
         try:
-            r = requests.get(BINANCE_BOOK_URL, timeout=10)
+            r = http_session.get(BINANCE_BOOK_URL, timeout=10)
             r.raise_for_status()
-            data = r.json()
+            data = _json_loads(r.content)
             out = {}
             for d in data:
                 try:
@@ -1081,7 +1864,7 @@ def get_binance_price(symbol, session, retries=1):
             if r.status_code != 200:
                 logger.debug("Binance ticker non-200 %s for %s: %s", r.status_code, symbol, r.text[:200])
                 return None, None
-            d = r.json()
+            d = _json_loads(r.content)
             bid = float(d.get("bidPrice") or 0)
             ask = float(d.get("askPrice") or 0)
             if bid <= 0 or ask <= 0:
@@ -1102,7 +1885,7 @@ def get_kucoin_price_once(symbol, session, retries=1):
             if r.status_code != 200:
                 logger.debug("KuCoin ticker non-200 %s for %s: %s", r.status_code, symbol, r.text[:200])
                 return None, None
-            data = r.json()
+            data = _json_loads(r.content)
             d = data.get("data", {}) if isinstance(data, dict) else {}
             bid = float(d.get("bestBidPrice") or d.get("bid") or 0)
             ask = float(d.get("bestAskPrice") or d.get("ask") or 0)
@@ -1121,17 +1904,16 @@ def threaded_kucoin_prices(symbols):
     if not symbols:
         return prices
     workers = min(MAX_WORKERS, max(4, len(symbols)))
-    with requests.Session() as session:
-        with ThreadPoolExecutor(max_workers=workers) as ex:
-            futures = {ex.submit(get_kucoin_price_once, s, session): s for s in symbols}
-            for fut in as_completed(futures):
-                s = futures[fut]
-                try:
-                    bid, ask = fut.result()
-                    if bid and ask:
-                        prices[s] = {"bid": bid, "ask": ask}
-                except Exception:
-                    logger.exception("threaded_kucoin_prices: future error for %s", s)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(get_kucoin_price_once, s, http_session): s for s in symbols}
+        for fut in as_completed(futures):
+            s = futures[fut]
+            try:
+                bid, ask = fut.result()
+                if bid and ask:
+                    prices[s] = {"bid": bid, "ask": ask}
+            except Exception:
+                logger.exception("threaded_kucoin_prices: future error for %s", s)
     logger.debug("[KUCOIN_BATCH] fetched %d/%d", len(prices), len(symbols))
     return prices
 
@@ -1150,6 +1932,15 @@ def calculate_spread(bin_bid, bin_ask, ku_bid, ku_ask):
         logger.exception("calculate_spread error")
         return None
 
+def classify_entry(bin_bid, bin_ask, kc_bid, kc_ask):
+    # Scalar-only decision kernel for the scanner's monitoring round: which case (if any) the
+    # quotes are in and its trigger spread in %, from a single comparison/division per tick.
+    if bin_ask < kc_bid:
+        return 'A', 100 * (kc_bid - bin_ask) / bin_ask
+    if bin_bid > kc_ask:
+        return 'B', 100 * (bin_bid - kc_ask) / kc_ask
+    return None, 0.0
+
 # -------------------- Pre-entry KuCoin margin check --------------------
 def ensure_kucoin_margin_available(kc_ccxt_sym, desired_notional):
     """
@@ -1161,7 +1952,7 @@ def ensure_kucoin_margin_available(kc_ccxt_sym, desired_notional):
         try:
             bal = kucoin.fetch_balance()
         except Exception as e:
-            print(f"{datetime.now().isoformat()} KUCOIN fetch_balance failed during margin check: {e}")
+            console_print(f"{datetime.now().isoformat()} KUCOIN fetch_balance failed during margin check: {e}")
             return None
         usdt_info = bal.get('USDT') or bal.get('USDT') or {}
         free = usdt_info.get('free') or usdt_info.get('available') or 0.0
@@ -1174,336 +1965,247 @@ def ensure_kucoin_margin_available(kc_ccxt_sym, desired_notional):
         if available >= required_initial:
             return True
         else:
-            print(f"{datetime.now().isoformat()} KUCOIN insufficient margin: need ~${required_initial:.4f} available=${available:.4f}")
+            console_print(f"{datetime.now().isoformat()} KUCOIN insufficient margin: need ~${required_initial:.4f} available=${available:.4f}")
             return False
     except Exception as e:
-        print(f"{datetime.now().isoformat()} Error in ensure_kucoin_margin_available: {e}")
+        console_print(f"{datetime.now().isoformat()} Error in ensure_kucoin_margin_available: {e}")
         return None
 
 # -------------------- Case A / Case B (trading logic preserved) --------------------
-def execute_caseA(bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_ask, kc_bid):
-    print(f"{trigger_time.strftime('%H:%M:%S.%f')[:-3]} ENTRY CASE A CONFIRMED  -> EXECUTING PARALLEL ORDERS for {bin_sym}/{kc_raw_sym}")
+# Persistent pool for the two parallel entry legs: workers are created (and warmed below) once,
+# so a trigger does not pay thread creation between detection and order submission.
+_order_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='order')
+for _f in [_order_pool.submit(time.sleep, 0.05) for _ in range(2)]:
+    _f.result()
+
+def _entry_spread(case, bin_px, kc_px):
+    # % the short leg sits above the long leg: caseA shorts KuCoin, caseB shorts Binance
+    if case == 'caseA':
+        return 100 * (kc_px - bin_px) / bin_px
+    return 100 * (bin_px - kc_px) / kc_px
+
+def _mismatch_pct(implied_bin, implied_kc):
+    # % gap between the legs relative to the larger one; 100 when neither leg has size
+    m = implied_bin if implied_bin > implied_kc else implied_kc
+    return abs(implied_bin - implied_kc) * 100.0 / m if m > 0 else 100.0
+
+def _commit_entry(case, bin_sym, exec_price_bin, exec_price_kc, exec_time_bin, exec_time_kc, trigger_time, bin_px, kc_px, final_entry_spread):
+    # every acceptance path (matched, post-rebalance, small residual) records the position the same way
+    with state_lock:
+        entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
+        entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_px, 'kucoin': kc_px}}
+        entry_spreads[bin_sym] = final_entry_spread
+        positions[bin_sym] = case
+        case_a = case == 'caseA'
+        exit_scale = 100.0 / (exec_price_bin if case_a else exec_price_kc)
+        entry_params[bin_sym] = (case, case_a, exec_price_bin, exec_price_kc, final_entry_spread, exit_scale)
+        trade_start_balances[bin_sym] = start_total_balance
+        entry_confirm_count[bin_sym] = 0
+
+def _execute_entry(case, bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_px, kc_px):
+    # caseA: long Binance at its ask / short KuCoin at its bid; caseB is the mirror image
+    bin_side, kc_side = ('buy', 'sell') if case == 'caseA' else ('sell', 'buy')
+    label = case[-1]
+    trig_hms = dt_hms_ms(trigger_time)
 
     notional_bin = NOTIONAL
     notional_kc = NOTIONAL
 
-    results = {}
-    def exec_kc(): results['kc'] = safe_create_order(kucoin, 'sell', notional_kc, kc_bid, kc_ccxt_sym, trigger_time=trigger_time, trigger_price=kc_bid)
-    def exec_bin(): results['bin'] = safe_create_order(binance, 'buy', notional_bin, bin_ask, bin_sym, trigger_time=trigger_time, trigger_price=bin_ask)
-    t1 = threading.Thread(target=exec_kc)
-    t2 = threading.Thread(target=exec_bin)
-    t1.start(); t2.start(); t1.join(); t2.join()
-    ok_kc, exec_price_kc, exec_time_kc = results.get('kc', (False, None, None))
-    ok_bin, exec_price_bin, exec_time_bin = results.get('bin', (False, None, None))
+    f_kc = _order_pool.submit(safe_create_order, kucoin, kc_side, notional_kc, kc_px, kc_ccxt_sym, trigger_time=trigger_time, trigger_price=kc_px)
+    f_bin = _order_pool.submit(safe_create_order, binance, bin_side, notional_bin, bin_px, bin_sym, trigger_time=trigger_time, trigger_price=bin_px)
+    # logged once both legs are in flight, so nothing sits between the entry call and the submits
+    console_print(f"{trig_hms} ENTRY CASE {label} CONFIRMED  -> EXECUTING PARALLEL ORDERS for {bin_sym}/{kc_raw_sym}")
+    wait([f_kc, f_bin])
+    ok_kc, exec_price_kc, exec_time_kc = f_kc.result() if f_kc.exception() is None else (False, None, None)
+    ok_bin, exec_price_bin, exec_time_bin = f_bin.result() if f_bin.exception() is None else (False, None, None)
     if ok_kc and ok_bin and exec_price_kc is not None and exec_price_bin is not None:
-        try:
-            implied_bin = compute_amount_for_notional(binance, bin_sym, notional_bin, exec_price_bin)[1]
-        except Exception:
-            implied_bin = 0.0
-        try:
-            implied_kc = compute_amount_for_notional(kucoin, kc_ccxt_sym, notional_kc, exec_price_kc)[1]
-        except Exception:
-            implied_kc = 0.0
-
-        mismatch_pct = abs(implied_bin - implied_kc) / max(implied_bin, implied_kc) * 100 if max(implied_bin, implied_kc) > 0 else 100
-        print(f"IMPLIED NOTIONALS | Binance: ${implied_bin:.6f} | KuCoin: ${implied_kc:.6f} | mismatch={mismatch_pct:.3f}%")
+        # compute_amount_for_notional returns 0 for a non-positive price, so no exception guard is needed
+        implied_bin = compute_amount_for_notional(binance, bin_sym, notional_bin, exec_price_bin)[1]
+        implied_kc = compute_amount_for_notional(kucoin, kc_ccxt_sym, notional_kc, exec_price_kc)[1]
+
+        mismatch_pct = _mismatch_pct(implied_bin, implied_kc)
+        console_print(f"IMPLIED NOTIONALS | Binance: ${implied_bin:.6f} | KuCoin: ${implied_kc:.6f} | mismatch={mismatch_pct:.3f}%")
+        # fills are final at this point, so every acceptance path below shares one spread computation
+        trigger_spread = _entry_spread(case, bin_px, kc_px)
+        real_entry_spread = _entry_spread(case, exec_price_bin, exec_price_kc)
+        use_trigger = real_entry_spread >= trigger_spread
+        final_entry_spread = trigger_spread if use_trigger else real_entry_spread
 
         if mismatch_pct <= MAX_NOTIONAL_MISMATCH_PCT:
-            real_entry_spread = 100 * (exec_price_kc - exec_price_bin) / exec_price_bin
-            trigger_spread = 100 * (kc_bid - bin_ask) / bin_ask
-            final_entry_spread = trigger_spread if real_entry_spread >= trigger_spread else real_entry_spread
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Spread: Real({real_entry_spread:.3f}%) {'≥' if real_entry_spread >= trigger_spread else '<'} Trigger({trigger_spread:.3f}%). Using {'Trigger' if real_entry_spread >= trigger_spread else 'Real'} Spread as profit basis.")
-            with state_lock:
-                entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
-                entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_ask, 'kucoin': kc_bid}}
-                entry_spreads[bin_sym] = final_entry_spread
-                positions[bin_sym] = 'caseA'
-                trade_start_balances[bin_sym] = start_total_balance
-                entry_confirm_count[bin_sym] = 0
-            sl_kc = exec_price_kc - kc_bid
-            sl_bin = exec_price_bin - bin_ask
-            try:
-                t0_ms = int(trigger_time.timestamp() * 1000)
-                if exec_time_kc:
-                    lat_kc = int(datetime.fromisoformat(exec_time_kc.replace('Z', '')).timestamp() * 1000) - t0_ms
-                if exec_time_bin:
-                    lat_bin = int(datetime.fromisoformat(exec_time_bin.replace('Z', '')).timestamp() * 1000) - t0_ms
-            except Exception:
-                pass
-            try:
-                implied_bin_logged = compute_amount_for_notional(binance, bin_sym, notional_bin, exec_price_bin)[1]
-                implied_kc_logged = compute_amount_for_notional(kucoin, kc_ccxt_sym, notional_kc, exec_price_kc)[1]
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} MATCHED NOTIONALS | bin_notional=${notional_bin:.6f} implied=${implied_bin_logged:.8f} | kc_notional=${notional_kc:.6f} implied=${implied_kc_logged:.8f}")
-            except Exception:
-                pass
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} ENTRY SUMMARY | trigger_time={trigger_time.strftime('%H:%M:%S.%f')[:-3]} | trigger_prices bin:{bin_ask} kc:{kc_bid}")
-            print(f" KuCoin executed: price={exec_price_kc} exec_time={exec_time_kc} slippage={sl_kc:.8f}")
-            print(f" Binance executed: price={exec_price_bin} exec_time={exec_time_bin} slippage={sl_bin:.8f}")
-            print(f" REAL Entry Spread: {real_entry_spread:.3f}% | PROFIT BASIS Spread: {final_entry_spread:.3f}%")
-
+            _commit_entry(case, bin_sym, exec_price_bin, exec_price_kc, exec_time_bin, exec_time_kc, trigger_time, bin_px, kc_px, final_entry_spread)
+            # arm the liquidation watcher before any logging so the position is never unwatched
             try:
                 _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
             except Exception as e:
-                print(f"{datetime.now().isoformat()} Failed to start liquidation watcher: {e}")
+                console_print(f"{now_hms_ms()} Failed to start liquidation watcher: {e}")
+            ts = now_hms_ms()
+            # each value is formatted once even where the summary repeats it
+            real3 = f"{real_entry_spread:.3f}"
+            console_print(f"{ts} Spread: Real({real3}%) {'≥' if use_trigger else '<'} Trigger({trigger_spread:.3f}%). Using {'Trigger' if use_trigger else 'Real'} Spread as profit basis.")
+            sl_kc = exec_price_kc - kc_px
+            sl_bin = exec_price_bin - bin_px
+            # the whole summary block is one queued line, so nothing can interleave with it
+            console_print("\n".join((
+                f"{ts} MATCHED NOTIONALS | bin_notional=${notional_bin:.6f} implied=${implied_bin:.8f} | kc_notional=${notional_kc:.6f} implied=${implied_kc:.8f}",
+                f"{ts} ENTRY SUMMARY | trigger_time={trig_hms} | trigger_prices bin:{bin_px} kc:{kc_px}",
+                f" KuCoin executed: price={exec_price_kc} exec_time={exec_time_kc} slippage={sl_kc:.8f}",
+                f" Binance executed: price={exec_price_bin} exec_time={exec_time_bin} slippage={sl_bin:.8f}",
+                f" REAL Entry Spread: {real3}% | PROFIT BASIS Spread: {real3 if final_entry_spread == real_entry_spread else f'{final_entry_spread:.3f}'}%",
+            )))
 
         else:
             diff_dollars = abs(implied_bin - implied_kc)
-            print(f"NOTIONAL MISMATCH {mismatch_pct:.3f}% -> diff ${diff_dollars:.6f}")
-            if diff_dollars >= REBALANCE_MIN_DOLLARS:
-                print("Attempting rebalance...")
-                reb_ok = False
-                reb_exec_price = None
-                if implied_bin < implied_kc:
-                    print("Rebalance -> BUY on Binance for diff")
-                    reb_ok, reb_exec_price, _ = safe_create_order(binance, 'buy', diff_dollars, exec_price_bin, bin_sym)
-                else:
-                    print("Rebalance -> SELL on KuCoin for diff")
-                    reb_ok, reb_exec_price, _ = safe_create_order(kucoin, 'sell', diff_dollars, exec_price_kc, kc_ccxt_sym)
-                if reb_ok:
-                    try:
-                        added_bin = compute_amount_for_notional(binance, bin_sym, diff_dollars, reb_exec_price or exec_price_bin)[1]
-                    except Exception:
-                        added_bin = 0.0
+            console_print(f"NOTIONAL MISMATCH {mismatch_pct:.3f}% -> diff ${diff_dollars:.6f}")
+            # a rebalance smaller than the venue's minimum order is rejected after a full round trip
+            # (and then forces a close of both legs), so it is accepted as a residual instead, up to a cap
+            if implied_bin < implied_kc:
+                reb_min = min_order_cost(binance, bin_sym, exec_price_bin)
+            else:
+                reb_min = min_order_cost(kucoin, kc_ccxt_sym, exec_price_kc)
+            if diff_dollars < REBALANCE_MIN_DOLLARS:
+                console_print("Mismatch below REBALANCE_MIN_DOLLARS — accepting small residual exposure and proceeding.")
+                _commit_entry(case, bin_sym, exec_price_bin, exec_price_kc, exec_time_bin, exec_time_kc, trigger_time, bin_px, kc_px, final_entry_spread)
+                try:
+                    _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
+                except Exception as e:
+                    console_print(f"{now_hms_ms()} Failed to start liquidation watcher: {e}")
+            elif diff_dollars < reb_min:
+                # the diff cannot be sent as an order; keep the legs only while the residual stays bounded
+                if mismatch_pct <= MAX_UNSENDABLE_MISMATCH_PCT:
+                    console_print(f"Rebalance diff ${diff_dollars:.6f} below venue minimum order ${reb_min:.6f} — not sendable; accepting residual ({mismatch_pct:.3f}% <= {MAX_UNSENDABLE_MISMATCH_PCT}%).")
+                    _commit_entry(case, bin_sym, exec_price_bin, exec_price_kc, exec_time_bin, exec_time_kc, trigger_time, bin_px, kc_px, final_entry_spread)
                     try:
-                        added_kc = compute_amount_for_notional(kucoin, kc_ccxt_sym, diff_dollars, reb_exec_price or exec_price_kc)[1]
-                    except Exception:
-                        added_kc = 0.0
-                    new_implied_bin = implied_bin + added_bin
-                    new_implied_kc = implied_kc + added_kc
-                    new_mismatch = abs(new_implied_bin - new_implied_kc) / max(new_implied_bin, new_implied_kc) * 100 if max(new_implied_bin, new_implied_kc) > 0 else 100
-                    print(f"Post-rebalance implieds | bin:${new_implied_bin:.6f} kc:${new_implied_kc:.6f} | mismatch={new_mismatch:.3f}%")
-                    if new_mismatch <= MAX_NOTIONAL_MISMATCH_PCT:
-                        real_entry_spread = 100 * (exec_price_kc - exec_price_bin) / exec_price_bin
-                        final_entry_spread = trigger_spread if real_entry_spread >= trigger_spread else real_entry_spread
-                        with state_lock:
-                            entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
-                            entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_ask, 'kucoin': kc_bid}}
-                            entry_spreads[bin_sym] = final_entry_spread
-                            positions[bin_sym] = 'caseA'
-                            trade_start_balances[bin_sym] = start_total_balance
-                            entry_confirm_count[bin_sym] = 0
-                        print("Rebalance succeeded — trade accepted and watcher will start.")
-                        try:
-                            _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
-                        except Exception as e:
-                            print(f"{datetime.now().isoformat()} Failed to start liquidation watcher: {e}")
-                    else:
-                        print("Rebalance insufficient — closing both sides to avoid naked exposure")
-                        close_all_and_wait()
-                        entry_confirm_count[bin_sym] = 0
+                        _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
+                    except Exception as e:
+                        console_print(f"{now_hms_ms()} Failed to start liquidation watcher: {e}")
                 else:
-                    print("Rebalance order failed — closing both sides to avoid naked exposure")
+                    console_print(f"Rebalance diff ${diff_dollars:.6f} below venue minimum order ${reb_min:.6f} but mismatch {mismatch_pct:.3f}% > {MAX_UNSENDABLE_MISMATCH_PCT}% — closing both sides to avoid naked exposure")
                     close_all_and_wait()
                     entry_confirm_count[bin_sym] = 0
             else:
-                print("Mismatch below REBALANCE_MIN_DOLLARS — accepting small residual exposure and proceeding.")
-                real_entry_spread = 100 * (exec_price_kc - exec_price_bin) / exec_price_bin
-                final_entry_spread = trigger_spread if real_entry_spread >= trigger_spread else real_entry_spread
-                with state_lock:
-                    entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
-                    entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_ask, 'kucoin': kc_bid}}
-                    entry_spreads[bin_sym] = final_entry_spread
-                    positions[bin_sym] = 'caseA'
-                    trade_start_balances[bin_sym] = start_total_balance
-                    entry_confirm_count[bin_sym] = 0
-                try:
-                    _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
-                except Exception as e:
-                    print(f"{datetime.now().isoformat()} Failed to start liquidation watcher: {e}")
-    else:
-        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} WARNING: Partial or failed execution in Case A. Closing positions if any.")
-        close_all_and_wait()
-        entry_confirm_count[bin_sym] = 0
-
-def execute_caseB(bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_bid, kc_ask):
-    print(f"{trigger_time.strftime('%H:%M:%S.%f')[:-3]} ENTRY CASE B CONFIRMED  -> EXECUTING PARALLEL ORDERS for {bin_sym}/{kc_raw_sym}")
-
-    notional_bin = NOTIONAL
-    notional_kc = NOTIONAL
-
-    results = {}
-    def exec_kc(): results['kc'] = safe_create_order(kucoin, 'buy', notional_kc, kc_ask, kc_ccxt_sym, trigger_time=trigger_time, trigger_price=kc_ask)
-    def exec_bin(): results['bin'] = safe_create_order(binance, 'sell', notional_bin, bin_bid, bin_sym, trigger_time=trigger_time, trigger_price=bin_bid)
-    t1 = threading.Thread(target=exec_kc)
-    t2 = threading.Thread(target=exec_bin)
-    t1.start(); t2.start(); t1.join(); t2.join()
-    ok_kc, exec_price_kc, exec_time_kc = results.get('kc', (False, None, None))
-    ok_bin, exec_price_bin, exec_time_bin = results.get('bin', (False, None, None))
-    if ok_kc and ok_bin and exec_price_kc is not None and exec_price_bin is not None:
-        try:
-            implied_bin = compute_amount_for_notional(binance, bin_sym, notional_bin, exec_price_bin)[1]
-        except Exception:
-            implied_bin = 0.0
-        try:
-            implied_kc = compute_amount_for_notional(kucoin, kc_ccxt_sym, notional_kc, exec_price_kc)[1]
-        except Exception:
-            implied_kc = 0.0
-
-        mismatch_pct = abs(implied_bin - implied_kc) / max(implied_bin, implied_kc) * 100 if max(implied_bin, implied_kc) > 0 else 100
-        print(f"IMPLIED NOTIONALS | Binance: ${implied_bin:.6f} | KuCoin: ${implied_kc:.6f} | mismatch={mismatch_pct:.3f}%")
-
-        if mismatch_pct <= MAX_NOTIONAL_MISMATCH_PCT:
-            real_entry_spread = 100 * (exec_price_bin - exec_price_kc) / exec_price_kc
-            trigger_spread = 100 * (bin_bid - kc_ask) / kc_ask
-            final_entry_spread = trigger_spread if real_entry_spread >= trigger_spread else real_entry_spread
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} Spread: Real({real_entry_spread:.3f}%) {'≥' if real_entry_spread >= trigger_spread else '<'} Trigger({trigger_spread:.3f}%). Using {'Trigger' if real_entry_spread >= trigger_spread else 'Real'} Spread as profit basis.")
-            with state_lock:
-                entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
-                entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_bid, 'kucoin': kc_ask}}
-                entry_spreads[bin_sym] = final_entry_spread
-                positions[bin_sym] = 'caseB'
-                trade_start_balances[bin_sym] = start_total_balance
-                entry_confirm_count[bin_sym] = 0
-            sl_kc = exec_price_kc - kc_ask
-            sl_bin = exec_price_bin - bin_bid
-            try:
-                t0_ms = int(trigger_time.timestamp() * 1000)
-                if exec_time_kc:
-                    lat_kc = int(datetime.fromisoformat(exec_time_kc.replace('Z', '')).timestamp() * 1000) - t0_ms
-                if exec_time_bin:
-                    lat_bin = int(datetime.fromisoformat(exec_time_bin.replace('Z', '')).timestamp() * 1000) - t0_ms
-            except Exception:
-                pass
-            try:
-                implied_bin_logged = compute_amount_for_notional(binance, bin_sym, notional_bin, exec_price_bin)[1]
-                implied_kc_logged = compute_amount_for_notional(kucoin, kc_ccxt_sym, notional_kc, exec_price_kc)[1]
-                print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} MATCHED NOTIONALS | bin_notional=${notional_bin:.6f} implied=${implied_bin_logged:.8f} | kc_notional=${notional_kc:.6f} implied=${implied_kc_logged:.8f}")
-            except Exception:
-                pass
-            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} ENTRY SUMMARY | trigger_time={trigger_time.strftime('%H:%M:%S.%f')[:-3]} | trigger_prices bin:{bin_bid} kc:{kc_ask}")
-            print(f" KuCoin executed: price={exec_price_kc} exec_time={exec_time_kc} slippage={sl_kc:.8f}")
-            print(f" Binance executed: price={exec_price_bin} exec_time={exec_time_bin} slippage={sl_bin:.8f}")
-            print(f" REAL Entry Spread: {real_entry_spread:.3f}% | PROFIT BASIS Spread: {final_entry_spread:.3f}%")
-
-            try:
-                _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
-            except Exception as e:
-                print(f"{datetime.now().isoformat()} Failed to start liquidation watcher: {e}")
-
-        else:
-            diff_dollars = abs(implied_bin - implied_kc)
-            print(f"NOTIONAL MISMATCH {mismatch_pct:.3f}% -> diff ${diff_dollars:.6f}")
-            if diff_dollars >= REBALANCE_MIN_DOLLARS:
-                print("Attempting rebalance...")
+                console_print("Attempting rebalance...")
                 reb_ok = False
                 reb_exec_price = None
-                if implied_bin < implied_kc:
-                    print("Rebalance -> SELL on Binance for diff")
-                    reb_ok, reb_exec_price, _ = safe_create_order(binance, 'sell', diff_dollars, exec_price_bin, bin_sym)
+                reb_on_bin = implied_bin < implied_kc
+                if reb_on_bin:
+                    console_print(f"Rebalance -> {bin_side.upper()} on Binance for diff")
+                    reb_ok, reb_exec_price, _ = safe_create_order(binance, bin_side, diff_dollars, exec_price_bin, bin_sym)
                 else:
-                    print("Rebalance -> BUY on KuCoin for diff")
-                    reb_ok, reb_exec_price, _ = safe_create_order(kucoin, 'buy', diff_dollars, exec_price_kc, kc_ccxt_sym)
+                    console_print(f"Rebalance -> {kc_side.upper()} on KuCoin for diff")
+                    reb_ok, reb_exec_price, _ = safe_create_order(kucoin, kc_side, diff_dollars, exec_price_kc, kc_ccxt_sym)
                 if reb_ok:
-                    try:
+                    # only the leg that received the rebalance order grew
+                    added_bin = added_kc = 0.0
+                    if reb_on_bin:
                         added_bin = compute_amount_for_notional(binance, bin_sym, diff_dollars, reb_exec_price or exec_price_bin)[1]
-                    except Exception:
-                        added_bin = 0.0
-                    try:
+                    else:
                         added_kc = compute_amount_for_notional(kucoin, kc_ccxt_sym, diff_dollars, reb_exec_price or exec_price_kc)[1]
-                    except Exception:
-                        added_kc = 0.0
                     new_implied_bin = implied_bin + added_bin
                     new_implied_kc = implied_kc + added_kc
-                    new_mismatch = abs(new_implied_bin - new_implied_kc) / max(new_implied_bin, new_implied_kc) * 100 if max(new_implied_bin, new_implied_kc) > 0 else 100
-                    print(f"Post-rebalance implieds | bin:${new_implied_bin:.6f} kc:${new_implied_kc:.6f} | mismatch={new_mismatch:.3f}%")
+                    new_mismatch = _mismatch_pct(new_implied_bin, new_implied_kc)
+                    console_print(f"Post-rebalance implieds | bin:${new_implied_bin:.6f} kc:${new_implied_kc:.6f} | mismatch={new_mismatch:.3f}%")
                     if new_mismatch <= MAX_NOTIONAL_MISMATCH_PCT:
-                        real_entry_spread = 100 * (exec_price_bin - exec_price_kc) / exec_price_kc
-                        final_entry_spread = trigger_spread if real_entry_spread >= trigger_spread else real_entry_spread
-                        with state_lock:
-                            entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
-                            entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_bid, 'kucoin': kc_ask}}
-                            entry_spreads[bin_sym] = final_entry_spread
-                            positions[bin_sym] = 'caseB'
-                            trade_start_balances[bin_sym] = start_total_balance
-                            entry_confirm_count[bin_sym] = 0
-                        print("Rebalance succeeded — trade accepted and watcher will start.")
+                        _commit_entry(case, bin_sym, exec_price_bin, exec_price_kc, exec_time_bin, exec_time_kc, trigger_time, bin_px, kc_px, final_entry_spread)
                         try:
                             _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
                         except Exception as e:
-                            print(f"{datetime.now().isoformat()} Failed to start liquidation watcher: {e}")
+                            console_print(f"{now_hms_ms()} Failed to start liquidation watcher: {e}")
+                        console_print("Rebalance succeeded — trade accepted and watcher started.")
                     else:
-                        print("Rebalance insufficient — closing both sides to avoid naked exposure")
+                        console_print("Rebalance insufficient — closing both sides to avoid naked exposure")
                         close_all_and_wait()
                         entry_confirm_count[bin_sym] = 0
                 else:
-                    print("Rebalance order failed — closing both sides to avoid naked exposure")
+                    console_print("Rebalance order failed — closing both sides to avoid naked exposure")
                     close_all_and_wait()
                     entry_confirm_count[bin_sym] = 0
-            else:
-                print("Mismatch below REBALANCE_MIN_DOLLARS — accepting small residual exposure and proceeding.")
-                real_entry_spread = 100 * (exec_price_bin - exec_price_kc) / exec_price_kc
-                final_entry_spread = trigger_spread if real_entry_spread >= trigger_spread else real_entry_spread
-                with state_lock:
-                    entry_prices[bin_sym] = {'kucoin': exec_price_kc, 'binance': exec_price_bin}
-                    entry_actual[bin_sym] = {'kucoin': {'exec_price': exec_price_kc, 'exec_time': exec_time_kc}, 'binance': {'exec_price': exec_price_bin, 'exec_time': exec_time_bin}, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_bid, 'kucoin': kc_ask}}
-                    entry_spreads[bin_sym] = final_entry_spread
-                    positions[bin_sym] = 'caseB'
-                    trade_start_balances[bin_sym] = start_total_balance
-                    entry_confirm_count[bin_sym] = 0
-                try:
-                    _start_liquidation_watcher_for_symbol(bin_sym, bin_sym, kc_ccxt_sym)
-                except Exception as e:
-                    print(f"{datetime.now().isoformat()} Failed to start liquidation watcher: {e}")
     else:
-        print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} WARNING: Partial or failed execution in Case B. Closing positions if any.")
+        console_print(f"{now_hms_ms()} WARNING: Partial or failed execution in Case {label}. Closing positions if any.")
         close_all_and_wait()
         entry_confirm_count[bin_sym] = 0
 
+def execute_caseA(bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_ask, kc_bid):
+    _execute_entry('caseA', bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_ask, kc_bid)
+
+def execute_caseB(bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_bid, kc_ask):
+    _execute_entry('caseB', bin_sym, kc_raw_sym, kc_ccxt_sym, trigger_time, bin_bid, kc_ask)
+
 # -------------------- EXIT MONITOR (keeps original exit logic) --------------------
 def exit_monitor_loop():
-    print("Exit monitor thread started.")
-    session = requests.Session()
+    console_print("Exit monitor thread started.")
+    # loop invariants as locals for the per-symbol exit checks
+    profit_target = PROFIT_TARGET
+    flat_hi = EXIT_FLAT_SPREAD
+    flat_lo = -EXIT_FLAT_SPREAD
+    exit_confirms = EXIT_CONFIRMS
+    exit_confirm_ms = EXIT_CONFIRM_MS
+    params_get = entry_params.get
+    # passes run on every pushed tick; the per-symbol status lines are limited to one per 100ms
+    status_gap_ns = 100_000_000
+    next_status_ns = {}
     while True:
         try:
             if terminate_bot:
-                print("Exit monitor: termination requested, exiting monitor loop.")
+                console_print("Exit monitor: termination requested, exiting monitor loop.")
                 break
             if not TRADED_BINANCE_SYMBOLS:
+                ws_watch('exit')
                 time.sleep(0.5)
                 continue
-            bin_symbols = list(set(TRADED_BINANCE_SYMBOLS))
-            ku_raw_symbols = [KUCOIN_RAW_MAP.get(sym) for sym in bin_symbols if KUCOIN_RAW_MAP.get(sym)]
+            # (sym, kc_raw) pairs resolved once per pass; the quote gather and the per-symbol loop share them
+            legs = [(sym, KUCOIN_RAW_MAP.get(sym)) for sym in dict.fromkeys(TRADED_BINANCE_SYMBOLS)]
+            bin_symbols = [sym for sym, _ in legs]
+            ku_raw_symbols = [kc_raw for _, kc_raw in legs if kc_raw]
             bin_prices, kc_prices = get_prices_for_symbols(bin_symbols, ku_raw_symbols)
-            for sym in list(bin_symbols):
+            # one timestamp per pass for the per-symbol status lines
+            pass_ts = now_hms_ms()[:8]
+            for sym, kc_raw in legs:
                 try:
-                    if positions.get(sym) is None:
+                    params = params_get(sym)
+                    if params is None or positions.get(sym) is None:
                         continue
-                    kc_raw = KUCOIN_RAW_MAP.get(sym)
-                    kc_ccxt = KUCOIN_CCXT_MAP.get(sym)
+                    case, case_a, entry_bin_px, entry_kc_px, entry_basis, exit_scale = params
                     bin_tick = bin_prices.get(sym)
                     kc_tick = kc_prices.get(kc_raw) if kc_raw else None
                     if not bin_tick or not kc_tick:
                         continue
                     bin_bid, bin_ask = bin_tick
                     kc_bid, kc_ask = kc_tick
-                    if positions.get(sym) == 'caseA':
-                        current_exit_spread = 100 * (kc_ask - bin_bid) / entry_prices[sym]['binance']
-                        captured = entry_spreads[sym] - current_exit_spread
+                    if case_a:
+                        current_exit_spread = (kc_ask - bin_bid) * exit_scale
+                        captured = entry_basis - current_exit_spread
                         current_entry_spread = 100 * (kc_bid - bin_ask) / bin_ask
-                    elif positions.get(sym) == 'caseB':
-                        current_exit_spread = 100 * (bin_bid - kc_ask) / entry_prices[sym]['kucoin']
-                        captured = entry_spreads[sym] - current_exit_spread
-                        current_entry_spread = 100 * (bin_bid - kc_ask) / kc_ask
                     else:
-                        continue
+                        current_exit_spread = (bin_bid - kc_ask) * exit_scale
+                        captured = entry_basis - current_exit_spread
+                        current_entry_spread = 100 * (bin_bid - kc_ask) / kc_ask
 
-                    print(f"{datetime.now().strftime('%H:%M:%S')} POSITION OPEN {sym} | Entry Spread (Trigger): {current_entry_spread:.3f}% | Entry Basis: {entry_spreads[sym]:.3f}% | Exit Spread: {current_exit_spread:.3f}% | Captured: {captured:.3f}% | Exit Confirm: {exit_confirm_count.get(sym,0) + (1 if (captured >= PROFIT_TARGET or abs(current_exit_spread) < 0.02) else 0)}/3")
-                    exit_condition = captured >= PROFIT_TARGET or abs(current_exit_spread) < 0.02
+                    exit_condition = captured >= profit_target or flat_lo < current_exit_spread < flat_hi
+                    now_ns = time.monotonic_ns()
+                    show_status = now_ns >= next_status_ns.get(sym, 0)
+                    if show_status:
+                        next_status_ns[sym] = now_ns + status_gap_ns
+                        console_print(f"{pass_ts} POSITION OPEN {sym} | Entry Spread (Trigger): {current_entry_spread:.3f}% | Entry Basis: {entry_basis:.3f}% | Exit Spread: {current_exit_spread:.3f}% | Captured: {captured:.3f}% | Exit Confirm: {exit_confirm_count.get(sym,0) + (1 if exit_condition else 0)}/{exit_confirms}")
                     if exit_condition:
                         exit_confirm_count[sym] = exit_confirm_count.get(sym, 0) + 1
-                        if exit_confirm_count[sym] >= 3:
-                            print(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} EXIT TRIGGERED 3/3 | Captured: {captured:.3f}% | Current spread: {current_exit_spread:.3f}% | Case: {positions[sym].upper()}")
-                            try:
-                                et = entry_actual[sym].get('trigger_time')
-                                tp = entry_actual[sym].get('trigger_price')
-                                print(f" ENTRY TRIGGER TIME: {et.strftime('%H:%M:%S.%f')[:-3] if et else 'N/A'} | trigger_prices: {tp}")
-                                print(f" ENTRY EXECUTED DETAILS: binance={entry_actual[sym].get('binance')} kucoin={entry_actual[sym].get('kucoin')}")
-                            except Exception:
-                                pass
+                        # like the entry side: the condition must hold for exit_confirm_ms, not just for
+                        # exit_confirms ticks; any failing pass resets the count and restarts the window
+                        if exit_confirm_count[sym] == 1:
+                            exit_first_seen_ns[sym] = now_ns
+                        held_ms = (now_ns - exit_first_seen_ns[sym]) // 1_000_000
+                        if exit_confirm_count[sym] >= exit_confirms and held_ms >= exit_confirm_ms:
+                            console_print(f"{now_hms_ms()} EXIT TRIGGERED (held {held_ms}ms, {exit_confirm_count[sym]} passes) | Captured: {captured:.3f}% | Current spread: {current_exit_spread:.3f}% | Case: {case.upper()}")
+                            ea = entry_actual.get(sym) or {}
+                            et = ea.get('trigger_time')
+                            console_print(f" ENTRY TRIGGER TIME: {dt_hms_ms(et) if et else 'N/A'} | trigger_prices: {ea.get('trigger_price')}")
+                            console_print(f" ENTRY EXECUTED DETAILS: binance={ea.get('binance')} kucoin={ea.get('kucoin')}")
                             close_all_and_wait()
                             positions[sym] = None
+                            entry_params.pop(sym, None)
                             entry_confirm_count[sym] = 0
                             exit_confirm_count[sym] = 0
+                            exit_first_seen_ns.pop(sym, None)
+                            next_status_ns.pop(sym, None)
                             try:
                                 with state_lock:
                                     if sym in TRADED_BINANCE_SYMBOLS:
@@ -1516,21 +2218,29 @@ def exit_monitor_loop():
                                     trade_start_balances.pop(sym, None)
                             except Exception:
                                 pass
-                        else:
-                            print(f"{datetime.now().strftime('%H:%M:%S')} → Exit condition met, confirming {exit_confirm_count[sym]}/3...")
+                        elif show_status:
+                            console_print(f"{pass_ts} → Exit condition met, confirming {exit_confirm_count[sym]}/{exit_confirms} (held {held_ms}/{exit_confirm_ms}ms)...")
                     else:
                         exit_confirm_count[sym] = 0
                 except Exception as e:
-                    print("Exit monitor per-symbol error:", e)
-            time.sleep(0.1)
+                    console_print("Exit monitor per-symbol error:", e)
+            # next pass on the next pushed quote; the timeout keeps the REST-only cadence unchanged. Pass
+            # frequency therefore follows the tick rate, which is why the exit confirm is gated on
+            # EXIT_CONFIRM_MS of hold time and not only on the EXIT_CONFIRMS pass count
+            with price_cond:
+                price_cond.wait(0.1)
         except Exception:
             logger.exception("Fatal error in exit monitor loop, sleeping briefly")
             time.sleep(1)
 
 # -------------------- SCANNER MAIN (3x confirms + single-position guard + margin pre-check) --------------------
 start_total_balance, start_bin_balance, start_kc_balance = get_total_futures_balance()
-print(f"Starting total balance approx: ${start_total_balance:.2f} (Binance: ${start_bin_balance:.2f} | KuCoin: ${start_kc_balance:.2f})\n")
-print(f"{datetime.now()} INTEGRATED BOT STARTED\n")
+console_print(f"Starting total balance approx: ${start_total_balance:.2f} (Binance: ${start_bin_balance:.2f} | KuCoin: ${start_kc_balance:.2f})\n")
+console_print(f"{datetime.now()} INTEGRATED BOT STARTED\n")
+
+start_ws_feeds()
+if CONN_KEEPALIVE_S > 0:
+    threading.Thread(target=_keep_connections_warm, name='conn-keepalive', daemon=True).start()
 
 _exit_thread = threading.Thread(target=exit_monitor_loop, daemon=True)
 _exit_thread.start()
@@ -1539,7 +2249,9 @@ def scanner_main_loop():
     global current_entry_symbol
     last_alert = {}
     heartbeat_counter = 0
-    http_session = requests.Session()
+    # config invariants and hot helpers bound once as locals for the per-symbol monitoring round
+    entry_min = ENTRY_SPREAD
+    classify = classify_entry
 
     while True:
         window_start = time.time()
@@ -1552,6 +2264,8 @@ def scanner_main_loop():
                 in_entry = entry_in_progress.is_set()
             if in_entry or any_open_trades:
                 logger.info("Entry in progress or trade open (%s). Skipping full scan until cleared.", TRADED_BINANCE_SYMBOLS)
+                if not in_entry:
+                    ws_watch('scanner')
                 # Sleep a short amount and let exit_monitor (or the entry thread) handle the opened position.
                 time.sleep(max(0.5, MONITOR_POLL))
                 continue
@@ -1567,12 +2281,18 @@ def scanner_main_loop():
             ku_prices = threaded_kucoin_prices(ku_symbols)
 
             candidates = {}
+            # Multiply-only pre-test over the whole universe (no divisions, no function calls);
+            # calculate_spread runs only on the sparse set of rows that can clear SCAN_THRESHOLD.
+            scan_hi = 1.0 + SCAN_THRESHOLD / 100.0
+            scan_lo = 1.0 - SCAN_THRESHOLD / 100.0
             for sym in common_symbols:
                 bin_tick = bin_book.get(sym)
                 ku_sym = ku_map.get(sym, sym + "M")
                 ku_tick = ku_prices.get(ku_sym)
                 if not bin_tick or not ku_tick:
                     continue
+                if ku_tick["bid"] < bin_tick["ask"] * scan_hi and ku_tick["ask"] > bin_tick["bid"] * scan_lo:
+                    continue
                 spread = calculate_spread(bin_tick["bid"], bin_tick["ask"], ku_tick["bid"], ku_tick["ask"])
                 if spread is not None and abs(spread) >= SCAN_THRESHOLD:
                     candidates[sym] = {
@@ -1586,6 +2306,7 @@ def scanner_main_loop():
             logger.info("[%s] Start window: shortlisted %d candidate(s): %s", timestamp(), len(candidates), list(candidates.keys())[:12])
 
             if not candidates:
+                ws_watch('scanner')
                 elapsed = time.time() - window_start
                 to_sleep = max(1, MONITOR_DURATION - elapsed)
                 logger.info("No candidates this minute — sleeping %.1fs before next full scan", to_sleep)
@@ -1605,6 +2326,7 @@ def scanner_main_loop():
             window_end = window_start + MONITOR_DURATION
             while time.time() < window_end and candidates:
                 round_start = time.time()
+                seen_seq = _price_seq
                 # Respect the focal restriction if a current_entry_symbol has been set; otherwise monitor all candidates.
                 with state_lock:
                     focal = current_entry_symbol
@@ -1629,13 +2351,25 @@ def scanner_main_loop():
                 workers = min(MAX_WORKERS, max(4, len(monitored)))
                 latest = {s: {"bin": None, "ku": None} for s in list(monitored.keys())}
 
+                # pushed quotes first; REST only for legs the WebSocket feed has not covered yet
+                ws_watch('scanner', monitored.keys(), [info["ku_sym"] for info in monitored.values()])
+                for sym, info in monitored.items():
+                    q = ws_quote(ws_bin_prices, sym)
+                    if q:
+                        latest[sym]["bin"] = {"bid": q[0], "ask": q[1]}
+                    q = ws_quote(ws_kc_prices, info["ku_sym"])
+                    if q:
+                        latest[sym]["ku"] = {"bid": q[0], "ask": q[1]}
+
                 with ThreadPoolExecutor(max_workers=workers) as ex:
                     fut_map = {}
                     for sym, info in list(monitored.items()):
                         ku_sym = info["ku_sym"]
                         b_symbol = sym
-                        fut_map[ex.submit(get_binance_price, b_symbol, http_session)] = ("bin", sym)
-                        fut_map[ex.submit(get_kucoin_price_once, ku_sym, http_session)] = ("ku", sym)
+                        if latest[sym]["bin"] is None:
+                            fut_map[ex.submit(get_binance_price, b_symbol, http_session)] = ("bin", sym)
+                        if latest[sym]["ku"] is None:
+                            fut_map[ex.submit(get_kucoin_price_once, ku_sym, http_session)] = ("ku", sym)
 
                     for fut in as_completed(fut_map):
                         typ, sym = fut_map[fut]
@@ -1658,134 +2392,92 @@ def scanner_main_loop():
                     bin_bid, bin_ask = b['bid'], b['ask']
                     kc_bid, kc_ask = k['bid'], k['ask']
 
-                    if bin_ask < kc_bid:
-                        trigger_spread = 100 * (kc_bid - bin_ask) / bin_ask
-                        if trigger_spread < ENTRY_SPREAD:
-                            entry_confirm_count[sym] = 0
-                    elif bin_bid > kc_ask:
-                        trigger_spread = 100 * (bin_bid - kc_ask) / kc_ask
-                        if trigger_spread < ENTRY_SPREAD:
-                            entry_confirm_count[sym] = 0
-                    else:
+                    case, trigger_spread = classify(bin_bid, bin_ask, kc_bid, kc_ask)
+                    if case is None:
                         entry_confirm_count[sym] = 0
                         continue
+                    if trigger_spread < entry_min:
+                        entry_confirm_count[sym] = 0
+                    # rounds that cannot confirm go to the DEBUG file log only; the console keeps the
+                    # confirm progression (each line there is a count that actually moved)
+                    log_case = logger.info if trigger_spread >= entry_min else logger.debug
 
-                    if bin_ask < kc_bid:
-                        trigger_spread = 100 * (kc_bid - bin_ask) / bin_ask
-                        logger.info("CASE A %s | Trigger Spread: %.3f%% | Confirm: %d/3", sym, trigger_spread, entry_confirm_count[sym] + 1)
-                        if positions.get(sym) is None and trigger_spread >= ENTRY_SPREAD and not closing_in_progress and not has_open_positions() and not entry_in_progress.is_set():
-                            entry_confirm_count[sym] += 1
-                            if entry_confirm_count[sym] >= 3:
-                                with state_lock:
-                                    entry_actual.setdefault(sym, {'binance': None, 'kucoin': None, 'trigger_time': None, 'trigger_price': None})
-                                    entry_actual[sym]['trigger_time'] = datetime.utcnow()
-                                    entry_actual[sym]['trigger_price'] = {'binance': bin_ask, 'kucoin': kc_bid}
-                                    trigger_time = entry_actual[sym]['trigger_time']
-                                print(f"{trigger_time.strftime('%H:%M:%S.%f')[:-3]} ENTRY CASE A CONFIRMED 3/3 -> EXECUTING PARALLEL ORDERS for {sym}")
-                                kc_ccxt = resolve_kucoin_trade_symbol(kucoin, info["ku_sym"])
-                                if not kc_ccxt:
-                                    logger.warning("Could not resolve KuCoin ccxt symbol for %s (raw %s) - skipping", sym, info["ku_sym"])
-                                    with state_lock:
-                                        entry_confirm_count[sym] = 0
-                                    candidates.pop(sym, None)
-                                    continue
-                                # set leverage & confirm application
-                                set_leverage_and_margin_for_symbol(sym, kc_ccxt)
-                                time.sleep(0.22)  # small delay to let exchange apply leverage/margin mode
-                                # KuCoin margin pre-check
-                                margin_ok = ensure_kucoin_margin_available(kc_ccxt, NOTIONAL)
-                                if margin_ok is False:
-                                    logger.warning("Skipping entry for %s due to insufficient KuCoin margin.", sym)
-                                    with state_lock:
-                                        entry_confirm_count[sym] = 0
-                                    candidates.pop(sym, None)
-                                    continue
-                                # mark current entry symbol so scanner restricts scanning to it until opened
+                    # A: long Binance at its ask / short KuCoin at its bid; B is the mirror image
+                    if case == 'A':
+                        bin_px, kc_px, execute = bin_ask, kc_bid, execute_caseA
+                    else:
+                        bin_px, kc_px, execute = bin_bid, kc_ask, execute_caseB
+                    log_case("CASE %s %s | Trigger Spread: %.3f%% | Confirm round: %d", case, sym, trigger_spread, entry_confirm_count[sym] + 1)
+                    # TRADED_BINANCE_SYMBOLS is non-empty whenever has_open_positions() could return True
+                    # (it only queries tracked symbols), so the list check replaces a REST round per tick
+                    if positions.get(sym) is None and trigger_spread >= entry_min and not closing_in_progress and not TRADED_BINANCE_SYMBOLS and not entry_in_progress.is_set():
+                        entry_confirm_count[sym] += 1
+                        # debounce on elapsed time, not round count: rounds follow ticks, so "3 rounds" could
+                        # be milliseconds or seconds. Any reset of the count restarts the window.
+                        now_ns = time.monotonic_ns()
+                        if entry_confirm_count[sym] == 1:
+                            entry_first_seen_ns[sym] = now_ns
+                        held_ms = (now_ns - entry_first_seen_ns[sym]) // 1_000_000
+                        if held_ms >= ENTRY_CONFIRM_MS:
+                            # no position is open for sym here, so the fill slots are still empty
+                            trigger_time = datetime.utcnow()
+                            with state_lock:
+                                entry_actual[sym] = {'binance': None, 'kucoin': None, 'trigger_time': trigger_time, 'trigger_price': {'binance': bin_px, 'kucoin': kc_px}}
+                            console_print(f"{dt_hms_ms(trigger_time)} ENTRY CASE {case} CONFIRMED (held {held_ms}ms, {entry_confirm_count[sym]} rounds) -> EXECUTING PARALLEL ORDERS for {sym}")
+                            kc_ccxt = resolve_kucoin_trade_symbol(kucoin, info["ku_sym"])
+                            if not kc_ccxt:
+                                logger.warning("Could not resolve KuCoin ccxt symbol for %s (raw %s) - skipping", sym, info["ku_sym"])
                                 with state_lock:
-                                    current_entry_symbol = sym
-                                entry_in_progress.set()
-                                try:
-                                    with state_lock:
-                                        if sym not in TRADED_BINANCE_SYMBOLS:
-                                            TRADED_BINANCE_SYMBOLS.append(sym)
-                                        KUCOIN_RAW_MAP[sym] = info["ku_sym"]
-                                        KUCOIN_CCXT_MAP[sym] = kc_ccxt
-                                    execute_caseA(sym, info["ku_sym"], kc_ccxt, trigger_time, bin_ask, kc_bid)
-                                except Exception as e:
-                                    logger.exception("Case A execution error for %s: %s", sym, e)
-                                    try:
-                                        close_all_and_wait()
-                                    except Exception:
-                                        pass
-                                finally:
-                                    entry_in_progress.clear()
-                                    with state_lock:
-                                        current_entry_symbol = None
+                                    entry_confirm_count[sym] = 0
                                 candidates.pop(sym, None)
-                        else:
-                            if not (positions.get(sym) is None and trigger_spread >= ENTRY_SPREAD and not closing_in_progress and not has_open_positions() and not entry_in_progress.is_set()):
-                                entry_confirm_count[sym] = 0
-
-                    elif bin_bid > kc_ask:
-                        trigger_spread = 100 * (bin_bid - kc_ask) / kc_ask
-                        logger.info("CASE B %s | Trigger Spread: %.3f%% | Confirm: %d/3", sym, trigger_spread, entry_confirm_count[sym] + 1)
-                        if positions.get(sym) is None and trigger_spread >= ENTRY_SPREAD and not closing_in_progress and not has_open_positions() and not entry_in_progress.is_set():
-                            entry_confirm_count[sym] += 1
-                            if entry_confirm_count[sym] >= 3:
+                                continue
+                            # set leverage & confirm application
+                            set_leverage_and_margin_for_symbol(sym, kc_ccxt)
+                            time.sleep(0.22)  # small delay to let exchange apply leverage/margin mode
+                            # KuCoin margin pre-check
+                            margin_ok = ensure_kucoin_margin_available(kc_ccxt, NOTIONAL)
+                            if margin_ok is False:
+                                logger.warning("Skipping entry for %s due to insufficient KuCoin margin.", sym)
                                 with state_lock:
-                                    entry_actual.setdefault(sym, {'binance': None, 'kucoin': None, 'trigger_time': None, 'trigger_price': None})
-                                    entry_actual[sym]['trigger_time'] = datetime.utcnow()
-                                    entry_actual[sym]['trigger_price'] = {'binance': bin_bid, 'kucoin': kc_ask}
-                                    trigger_time = entry_actual[sym]['trigger_time']
-                                print(f"{trigger_time.strftime('%H:%M:%S.%f')[:-3]} ENTRY CASE B CONFIRMED 3/3 -> EXECUTING PARALLEL ORDERS for {sym}")
-                                kc_ccxt = resolve_kucoin_trade_symbol(kucoin, info["ku_sym"])
-                                if not kc_ccxt:
-                                    logger.warning("Could not resolve KuCoin ccxt symbol for %s (raw %s) - skipping", sym, info["ku_sym"])
-                                    with state_lock:
-                                        entry_confirm_count[sym] = 0
-                                    candidates.pop(sym, None)
-                                    continue
-                                set_leverage_and_margin_for_symbol(sym, kc_ccxt)
-                                time.sleep(0.22)
-                                margin_ok = ensure_kucoin_margin_available(kc_ccxt, NOTIONAL)
-                                if margin_ok is False:
-                                    logger.warning("Skipping entry for %s due to insufficient KuCoin margin.", sym)
-                                    with state_lock:
-                                        entry_confirm_count[sym] = 0
-                                    candidates.pop(sym, None)
-                                    continue
+                                    entry_confirm_count[sym] = 0
+                                candidates.pop(sym, None)
+                                continue
+                            # mark current entry symbol so scanner restricts scanning to it until opened
+                            with state_lock:
+                                current_entry_symbol = sym
+                            entry_in_progress.set()
+                            try:
                                 with state_lock:
-                                    current_entry_symbol = sym
-                                entry_in_progress.set()
+                                    if sym not in TRADED_BINANCE_SYMBOLS:
+                                        TRADED_BINANCE_SYMBOLS.append(sym)
+                                    KUCOIN_RAW_MAP[sym] = info["ku_sym"]
+                                    KUCOIN_CCXT_MAP[sym] = kc_ccxt
+                                execute(sym, info["ku_sym"], kc_ccxt, trigger_time, bin_px, kc_px)
+                            except Exception as e:
+                                logger.exception("Case %s execution error for %s: %s", case, sym, e)
                                 try:
-                                    with state_lock:
-                                        if sym not in TRADED_BINANCE_SYMBOLS:
-                                            TRADED_BINANCE_SYMBOLS.append(sym)
-                                        KUCOIN_RAW_MAP[sym] = info["ku_sym"]
-                                        KUCOIN_CCXT_MAP[sym] = kc_ccxt
-                                    execute_caseB(sym, info["ku_sym"], kc_ccxt, trigger_time, bin_bid, kc_ask)
-                                except Exception as e:
-                                    logger.exception("Case B execution error for %s: %s", sym, e)
-                                    try:
-                                        close_all_and_wait()
-                                    except Exception:
-                                        pass
-                                finally:
-                                    entry_in_progress.clear()
-                                    with state_lock:
-                                        current_entry_symbol = None
-                                candidates.pop(sym, None)
-                        else:
-                            if not (positions.get(sym) is None and trigger_spread >= ENTRY_SPREAD and not closing_in_progress and not has_open_positions() and not entry_in_progress.is_set()):
-                                entry_confirm_count[sym] = 0
+                                    close_all_and_wait()
+                                except Exception:
+                                    pass
+                            finally:
+                                entry_in_progress.clear()
+                                with state_lock:
+                                    current_entry_symbol = None
+                            candidates.pop(sym, None)
+                    else:
+                        entry_confirm_count[sym] = 0
 
-                elapsed = time.time() - round_start
-                sleep_for = MONITOR_POLL - elapsed
+                # tick-driven pacing: the next round starts on the first pushed top-of-book change after
+                # SCANNER_MIN_ROUND_S, and no later than MONITOR_POLL when nothing is pushed (REST-only legs)
+                now = time.time()
+                min_gap = min(round_start + SCANNER_MIN_ROUND_S, window_end) - now
+                if min_gap > 0:
+                    time.sleep(min_gap)
+                    now = time.time()
+                sleep_for = min(round_start + MONITOR_POLL, window_end) - now
                 if sleep_for > 0:
-                    if time.time() + sleep_for > window_end:
-                        sleep_for = max(0, window_end - time.time())
-                    if sleep_for > 0:
-                        time.sleep(sleep_for)
+                    with price_cond:
+                        price_cond.wait_for(lambda: _price_seq != seen_seq, sleep_for)
 
             overall_max = None; overall_max_sym = None
             overall_min = None; overall_min_sym = None
@@ -1810,21 +2502,44 @@ def scanner_main_loop():
                 logger.info("Scanner alive — %s", timestamp())
 
         except KeyboardInterrupt:
-            print("Stopping integrated bot (KeyboardInterrupt)...")
+            console_print("Stopping integrated bot (KeyboardInterrupt)...")
             try:
                 close_all_and_wait()
             except Exception as e:
-                print("Error during graceful shutdown close:", e)
+                console_print("Error during graceful shutdown close:", e)
             break
 
         except Exception:
             logger.exception("Fatal error in scanner main loop, sleeping briefly before retry")
             time.sleep(5)
 
+def pin_to_cpus(spec):
+    """
+    Pin every thread of the process to the cores in spec (Linux only).
+    Affinity is per thread there and the pools, feeds and writers are already running by now,
+    so each task under /proc/self/task is pinned; threads started later inherit the mask.
+    """
+    if not spec or not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        cpus = {int(c) for c in spec.split(',') if c.strip()}
+        for tid in os.listdir('/proc/self/task'):
+            try:
+                os.sched_setaffinity(int(tid), cpus)
+            except ProcessLookupError:
+                pass  # thread exited meanwhile
+        logger.info("Pinned to CPUs %s", sorted(cpus))
+    except Exception as e:
+        logger.warning("CPU pinning (%s) failed: %s", spec, e)
+
 if __name__ == "__main__":
+    pin_to_cpus(CPU_AFFINITY)
     try:
         scanner_main_loop()
     except KeyboardInterrupt:
         logger.info("Interrupted by user, shutting down.")
     except Exception:
         logger.exception("Unhandled exception at top level")
+    finally:
+        _log_listener.stop()  # drain queued records before exit
+        stop_console_writer()